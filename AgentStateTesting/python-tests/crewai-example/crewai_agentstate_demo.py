@@ -10,43 +10,82 @@ This example shows:
 - Agent memory and context persistence
 """
 
+import argparse
 import os
+import threading
 import time
-from typing import Dict, Any, List, Optional
-from agentstate import AgentStateClient
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, List, Optional, Union
+from agentstate import AgentStateClient, PreparedQuery
+
+# crewai / langchain are imported on first use: they are slow to import and
+# not needed for state management or cleanup alone.
 
 
 class AgentStateManager:
     """Manages AgentState integration for CrewAI agents"""
     
-    def __init__(self, base_url: str = None, namespace: str = "crewai-demo", api_key: str = None):
+    def __init__(self, base_url: str = None, namespace: str = "crewai-demo", api_key: str = None,
+                 query_ttl: float = 3.0):
         self.client = AgentStateClient(
             base_url=base_url or os.getenv('AGENTSTATE_URL', 'http://localhost:8080'),
             namespace=namespace,
             api_key=api_key or os.getenv('AGENTSTATE_API_KEY')
         )
         self.namespace = namespace
+        # Short-lived query cache: tool calls within one agent turn reuse results.
+        # Any write through this manager bumps the version, invalidating entries.
+        self.query_ttl = query_ttl
+        self._query_cache = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        # Hot filters used on every tool call, encoded once
+        self.crew_agents_query = self.client.prepare_query({"framework": "crewai", "type": "crewai-agent"})
+        self.findings_query = self.client.prepare_query({
+            "framework": "crewai",
+            "type": "finding",
+            "category": "research"
+        })
+    
+    def create_agent(self, **kwargs) -> Dict[str, Any]:
+        """Create or update an object and invalidate cached queries"""
+        with self._lock:
+            self._version += 1
+        return self.client.create_agent(**kwargs)
+    
+    def query_agents(self, query: Union[Dict[str, str], PreparedQuery]) -> List[Dict[str, Any]]:
+        """Query by tags (or a PreparedQuery), reusing a result younger than query_ttl seconds"""
+        prepared = isinstance(query, PreparedQuery)
+        key = (query if prepared else frozenset(query.items()), self._version)
+        now = time.monotonic()
+        hit = self._query_cache.get(key)
+        if hit and now - hit[0] < self.query_ttl:
+            return hit[1]
+        result = query.execute() if prepared else self.client.query_agents(query)
+        with self._lock:
+            self._query_cache = {k: v for k, v in self._query_cache.items() if k[1] == self._version}
+            self._query_cache[key] = (now, result)
+        return result
     
     def save_agent_state(self, agent_id: str, role: str, state_data: Dict[str, Any], 
                         tags: Dict[str, str] = None) -> Dict[str, Any]:
         """Save agent state to AgentState"""
         agent_tags = {
             "framework": "crewai",
+            # crew_agents_query filters on this tag
+            "type": "crewai-agent",
             "role": role,
             "namespace": self.namespace,
             **(tags or {})
         }
         
-        return self.client.create_agent(
+        return self.create_agent(
             agent_type="crewai-agent",
             body={
                 "role": role,
                 "state": state_data,
-                "last_updated": time.time(),
-                **state_data
+                "last_updated": time.time()
             },
             tags=agent_tags,
             agent_id=agent_id
@@ -62,7 +101,7 @@ class AgentStateManager:
     
     def save_task_progress(self, task_id: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save task progress to AgentState"""
-        return self.client.create_agent(
+        return self.create_agent(
             agent_type="crewai-task",
             body={
                 "task_data": task_data,
@@ -76,23 +115,48 @@ class AgentStateManager:
             agent_id=task_id
         )
     
+    def get_task_progress(self, task_id: str) -> Dict[str, Any]:
+        """Get task progress from AgentState"""
+        try:
+            task = self.client.get_agent(task_id)
+            return task['body'].get('task_data', {})
+        except:
+            return {}
+    
     def get_crew_agents(self) -> List[Dict[str, Any]]:
         """Get all CrewAI agents from AgentState"""
-        return self.client.query_agents({"framework": "crewai", "type": "crewai-agent"})
+        return self.query_agents(self.crew_agents_query)
     
     def cleanup_demo_data(self):
         """Clean up demo agents and tasks"""
-        agents = self.client.query_agents({"framework": "crewai"})
-        for agent in agents:
-            self.client.delete_agent(agent['id'])
-        return len(agents)
+        # Stream the matches and dispatch deletes in chunks while the
+        # response is still arriving
+        count = 0
+        chunk = []
+        futures = []
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for agent in self.client.iter_query_agents({"framework": "crewai"}):
+                chunk.append(agent['id'])
+                count += 1
+                if len(chunk) == 256:
+                    futures.append(executor.submit(self.client.delete_agents_bulk, chunk))
+                    chunk = []
+            if chunk:
+                futures.append(executor.submit(self.client.delete_agents_bulk, chunk))
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Failed to delete a chunk of demo objects: {e}")
+        with self._lock:
+            self._version += 1
+        return count
 
 
 # Global state manager instance
 state_manager = AgentStateManager()
 
 
-@tool
 def save_research_findings(findings: str) -> str:
     """Save research findings to AgentState for sharing with other agents"""
     try:
@@ -102,7 +166,7 @@ def save_research_findings(findings: str) -> str:
             "type": "research_finding"
         }
         
-        result = state_manager.client.create_agent(
+        result = state_manager.create_agent(
             agent_type="research-finding",
             body=finding_data,
             tags={
@@ -117,35 +181,29 @@ def save_research_findings(findings: str) -> str:
         return f"Error saving research findings: {str(e)}"
 
 
-@tool
 def get_shared_findings() -> str:
     """Get shared research findings from AgentState"""
     try:
-        findings = state_manager.client.query_agents({
-            "framework": "crewai",
-            "type": "finding",
-            "category": "research"
-        })
+        findings = state_manager.query_agents(state_manager.findings_query)
         
         if not findings:
             return "No shared research findings available."
         
-        result = "Shared Research Findings:\n"
-        for finding in findings[-3:]:  # Get last 3 findings
-            content = finding['body'].get('content', 'No content')
-            timestamp = finding['body'].get('timestamp', 0)
-            result += f"- {content} (saved at {time.ctime(timestamp)})\n"
+        parts = ["Shared Research Findings:"]
+        parts.extend(
+            f"- {f['body'].get('content', 'No content')} (saved at {time.ctime(f['body'].get('timestamp', 0))})"
+            for f in findings[-3:]  # Get last 3 findings
+        )
         
-        return result
+        return "\n".join(parts) + "\n"
     except Exception as e:
         return f"Error retrieving shared findings: {str(e)}"
 
 
-@tool
 def coordinate_with_agents(message: str) -> str:
     """Send coordination message to all agents in the crew"""
     try:
-        coord_msg = state_manager.client.create_agent(
+        coord_msg = state_manager.create_agent(
             agent_type="coordination-message",
             body={
                 "message": message,
@@ -166,10 +224,26 @@ def coordinate_with_agents(message: str) -> str:
         return f"Error sending coordination message: {str(e)}"
 
 
+_crew_tools = None
+
+
+def get_crew_tools() -> Dict[str, Any]:
+    """Wrap the tool functions as LangChain tools (imports langchain on first call)"""
+    global _crew_tools
+    if _crew_tools is None:
+        from langchain.tools import tool
+        _crew_tools = {
+            fn.__name__: tool(fn)
+            for fn in (save_research_findings, get_shared_findings, coordinate_with_agents)
+        }
+    return _crew_tools
+
+
 class CrewAIAgentStateDemo:
     """Demo class for CrewAI + AgentState integration"""
     
     def __init__(self):
+        from langchain_openai import ChatOpenAI
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.7
@@ -178,6 +252,8 @@ class CrewAIAgentStateDemo:
         
     def create_research_crew(self):
         """Create a research crew with persistent state"""
+        from crewai import Agent
+        tools = get_crew_tools()
         
         # Research Agent
         researcher = Agent(
@@ -188,7 +264,7 @@ class CrewAIAgentStateDemo:
             You always save important findings for your team to use.""",
             verbose=True,
             allow_delegation=False,
-            tools=[save_research_findings, get_shared_findings],
+            tools=[tools["save_research_findings"], tools["get_shared_findings"]],
             llm=self.llm
         )
         
@@ -201,7 +277,7 @@ class CrewAIAgentStateDemo:
             check for shared findings before starting your work.""",
             verbose=True,
             allow_delegation=False,
-            tools=[get_shared_findings, coordinate_with_agents],
+            tools=[tools["get_shared_findings"], tools["coordinate_with_agents"]],
             llm=self.llm
         )
         
@@ -214,7 +290,7 @@ class CrewAIAgentStateDemo:
             maintain quality throughout the process.""",
             verbose=True,
             allow_delegation=False,
-            tools=[get_shared_findings, coordinate_with_agents],
+            tools=[tools["get_shared_findings"], tools["coordinate_with_agents"]],
             llm=self.llm
         )
         
@@ -222,6 +298,7 @@ class CrewAIAgentStateDemo:
     
     def create_research_tasks(self, agents):
         """Create tasks for the research crew"""
+        from crewai import Task
         researcher, writer, qa_agent = agents
         
         # Research Task
@@ -272,6 +349,7 @@ class CrewAIAgentStateDemo:
     
     def run_crew_demo(self):
         """Run the CrewAI demo with AgentState integration"""
+        from crewai import Crew, Process
         print("🤖 CrewAI + AgentState Integration Demo")
         print("=" * 50)
         
@@ -279,11 +357,10 @@ class CrewAIAgentStateDemo:
         agents = self.create_research_crew()
         tasks = self.create_research_tasks(agents)
         
-        # Save agent states before starting
-        for i, agent in enumerate(agents):
-            agent_id = f"crewai-agent-{i}"
-            self.state_manager.save_agent_state(
-                agent_id=agent_id,
+        # Save agent states concurrently before starting
+        def save_initial_state(i, agent):
+            return self.state_manager.save_agent_state(
+                agent_id=f"crewai-agent-{i}",
                 role=agent.role,
                 state_data={
                     "status": "initialized",
@@ -293,6 +370,9 @@ class CrewAIAgentStateDemo:
                 tags={"position": str(i)}
             )
         
+        with ThreadPoolExecutor(max_workers=len(agents)) as executor:
+            list(executor.map(save_initial_state, range(len(agents)), agents))
+        
         # Create and run crew
         crew = Crew(
             agents=agents,
@@ -319,9 +399,10 @@ class CrewAIAgentStateDemo:
         
         # Display AgentState data
         print("\n📊 AgentState Data Summary:")
-        agents_data = self.state_manager.get_crew_agents() 
-        findings = self.state_manager.client.query_agents({"framework": "crewai", "type": "finding"})
-        coord_messages = self.state_manager.client.query_agents({"framework": "crewai", "type": "coordination"})
+        all_crew = self.state_manager.query_agents({"framework": "crewai"})
+        agents_data = [a for a in all_crew if a['type'] == 'crewai-agent']
+        findings = [a for a in all_crew if a['tags'].get('type') == 'finding']
+        coord_messages = [a for a in all_crew if a['tags'].get('type') == 'coordination']
         
         print(f"  Agents tracked: {len(agents_data)}")
         print(f"  Research findings: {len(findings)}")
@@ -329,14 +410,59 @@ class CrewAIAgentStateDemo:
         
         return result
     
+    def submit_crew_demo(self, executor: ThreadPoolExecutor):
+        """Run the crew on a worker and track its status in AgentState.
+        
+        Returns the task id and a future for the crew result. Other processes
+        can poll the task object (status running/completed/failed) instead of
+        blocking on the LLM calls.
+        """
+        task_id = f"crew-run-{uuid.uuid4().hex}"
+        self.state_manager.save_task_progress(task_id, {"status": "running"})
+        
+        def run():
+            try:
+                result = self.run_crew_demo()
+            except Exception as e:
+                self.state_manager.save_task_progress(task_id, {"status": "failed", "error": str(e)})
+                raise
+            self.state_manager.save_task_progress(task_id, {"status": "completed", "result": str(result)})
+            return result
+        
+        return task_id, executor.submit(run)
+    
     def cleanup(self):
         """Clean up demo data"""
         count = self.state_manager.cleanup_demo_data()
         print(f"🧹 Cleaned up {count} demo objects from AgentState")
 
 
+def run_in_background(demo: CrewAIAgentStateDemo, poll_interval: float = 5.0):
+    """Submit the crew to a worker and report its AgentState task status until done"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        task_id, future = demo.submit_crew_demo(executor)
+        print(f"📨 Submitted crew run {task_id}")
+        try:
+            while True:
+                try:
+                    return future.result(timeout=poll_interval)
+                except FutureTimeout:
+                    status = demo.state_manager.get_task_progress(task_id).get('status', 'unknown')
+                    print(f"⏳ Crew run {task_id}: {status}")
+        except KeyboardInterrupt:
+            # The worker thread can't be stopped; leaving the with block waits
+            # for it, so cleanup never races its writes
+            print(f"\n⏳ Waiting for crew run {task_id} to finish before cleanup...")
+            raise
+
+
 def main():
     """Run the CrewAI + AgentState demo"""
+    parser = argparse.ArgumentParser(description="CrewAI + AgentState demo")
+    parser.add_argument("--background", action="store_true",
+                        help="run the crew on a worker thread and poll its task status in AgentState")
+    args = parser.parse_args()
+    
     if not os.getenv('OPENAI_API_KEY'):
         print("❌ Please set OPENAI_API_KEY environment variable")
         return
@@ -344,7 +470,11 @@ def main():
     demo = CrewAIAgentStateDemo()
     
     try:
-        demo.run_crew_demo()
+        if args.background:
+            run_in_background(demo)
+        else:
+            # Ctrl-C stops the crew itself, so cleanup never races its writes
+            demo.run_crew_demo()
     except KeyboardInterrupt:
         print("\n⏹️  Demo interrupted by user")
     except Exception as e:
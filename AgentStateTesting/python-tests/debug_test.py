@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Debug test to see what's happening with the SDK"""
 
+import atexit
 import traceback
 from agentstate import AgentStateClient
 
-# Test basic functionality
+# Test basic functionality (one client; pooled connections released on exit)
 client = AgentStateClient("http://localhost:8080", "testing")
+atexit.register(client.session.close)
 
 print("Testing health check...")
 try:
@@ -10,8 +10,16 @@ This example shows:
 - Agent coordination through shared state
 """
 
+import ast
+import atexit
+import functools
+import operator
 import os
 import time
+import traceback
+import weakref
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from agentstate import AgentStateClient
 try:
@@ -45,95 +53,172 @@ from pydantic import BaseModel
 class AgentStateMemory(BaseChatMessageHistory):
     """LangChain memory implementation using AgentState as backend"""
     
-    def __init__(self, agent_id: str, agentstate_client: AgentStateClient):
+    # Every live memory; anything still buffered is flushed at interpreter exit
+    _live: "weakref.WeakSet[AgentStateMemory]" = weakref.WeakSet()
+    
+    def __init__(self, agent_id: str, agentstate_client: AgentStateClient, flush_every: int = 1):
         self.agent_id = agent_id
         self.client = agentstate_client
+        # Messages are appended as they arrive; flush_every > 1 batches them into
+        # one append call (add_messages always sends a whole turn in one call)
+        self.flush_every = flush_every
+        self._pending: List[Dict[str, Any]] = []
+        # Local copy of the agent; writes carry its commit_seq so a concurrent
+        # change is rejected (409) and triggers a reload instead of a clobber
+        self._agent: Dict[str, Any] = {}
+        # Materialized LangChain messages (stored + pending); None means rebuild
+        self._msgs_cache: Optional[List[BaseMessage]] = None
         self._ensure_agent_exists()
+        AgentStateMemory._live.add(self)
+    
+    @classmethod
+    def flush_all(cls) -> None:
+        """Flush every live memory's buffered messages"""
+        for memory in list(cls._live):
+            try:
+                memory.flush()
+            except Exception as e:
+                print(f"❌ Failed to flush messages for {memory.agent_id}: {e}")
     
     def _ensure_agent_exists(self):
-        """Ensure the agent exists in AgentState"""
-        print(f"Checking if agent {self.agent_id} exists in AgentState...")
+        """Ensure the agent exists in AgentState (single get-or-create request)"""
+        print(f"Loading agent {self.agent_id} from AgentState...")
         try:
-            self.client.get_agent(self.agent_id)
-            print(f"✅ Agent {self.agent_id} already exists")
+            self._agent = self.client.get_or_create_agent(
+                self.agent_id,
+                agent_type="langchain-agent",
+                body={
+                    "name": f"LangChain Agent {self.agent_id}",
+                    "memory": {"messages": []},
+                    "created_at": time.time()
+                },
+                tags={
+                    "framework": "langchain",
+                    "type": "chat-agent"
+                }
+            )
+            print(f"✅ Agent {self.agent_id} ready in AgentState")
         except Exception as e:
-            print(f"Agent {self.agent_id} doesn't exist, creating it... (Error was: {e})")
-            try:
-                # Create agent if it doesn't exist
-                self.client.create_agent(
-                    agent_type="langchain-agent",
-                    body={
-                        "name": f"LangChain Agent {self.agent_id}",
-                        "memory": {"messages": []},
-                        "created_at": time.time()
-                    },
-                    tags={
-                        "framework": "langchain",
-                        "type": "chat-agent"
-                    },
-                    agent_id=self.agent_id
-                )
-                print(f"✅ Created agent {self.agent_id} in AgentState")
-            except Exception as create_error:
-                print(f"❌ Failed to create agent {self.agent_id}: {create_error}")
-                raise
+            print(f"❌ Failed to load or create agent {self.agent_id}: {e}")
+            raise
+    
+    @staticmethod
+    def _to_message(msg_data: Dict[str, Any]) -> Optional[BaseMessage]:
+        if msg_data['type'] == 'human':
+            return HumanMessage(content=msg_data['content'])
+        if msg_data['type'] == 'ai':
+            return AIMessage(content=msg_data['content'])
+        return None
     
     @property 
     def messages(self) -> List[BaseMessage]:
-        """Get messages from AgentState"""
-        agent = self.client.get_agent(self.agent_id)
-        messages_data = agent['body'].get('memory', {}).get('messages', [])
-        
-        messages = []
-        for msg_data in messages_data:
-            if msg_data['type'] == 'human':
-                messages.append(HumanMessage(content=msg_data['content']))
-            elif msg_data['type'] == 'ai':
-                messages.append(AIMessage(content=msg_data['content']))
-        
-        return messages
+        """Get messages (built once from the cached agent, then kept up to date)"""
+        if self._msgs_cache is None:
+            messages_data = self._agent['body'].get('memory', {}).get('messages', []) + self._pending
+            self._msgs_cache = [m for m in map(self._to_message, messages_data) if m is not None]
+        return self._msgs_cache
     
-    def add_message(self, message: BaseMessage) -> None:
-        """Add a message to AgentState"""
-        # Get current agent state
-        agent = self.client.get_agent(self.agent_id)
-        current_messages = agent['body'].get('memory', {}).get('messages', [])
-        
-        # Add new message
+    @staticmethod
+    def _to_data(message: BaseMessage) -> Dict[str, Any]:
         if isinstance(message, HumanMessage):
-            msg_data = {"type": "human", "content": message.content}
-        elif isinstance(message, AIMessage):
-            msg_data = {"type": "ai", "content": message.content}
-        else:
-            msg_data = {"type": "system", "content": str(message.content)}
-        
-        current_messages.append(msg_data)
-        
-        # Update agent in AgentState
-        updated_body = agent['body'].copy()
-        updated_body['memory']['messages'] = current_messages
-        updated_body['last_message_at'] = time.time()
-        
-        self.client.create_agent(
-            agent_type="langchain-agent",
-            body=updated_body,
-            tags=agent['tags'],
-            agent_id=self.agent_id
-        )
+            return {"type": "human", "content": message.content}
+        if isinstance(message, AIMessage):
+            return {"type": "ai", "content": message.content}
+        return {"type": "system", "content": str(message.content)}
+    
+    def _buffer(self, messages: List[BaseMessage]) -> None:
+        for message in messages:
+            msg_data = self._to_data(message)
+            self._pending.append(msg_data)
+            if self._msgs_cache is not None and msg_data['type'] != 'system':
+                self._msgs_cache.append(message)
+    
+    def add_message(self, message: BaseMessage) -> None:
+        """Record a message; sent once flush_every messages are buffered"""
+        self._buffer([message])
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+    
+    def add_messages(self, messages: List[BaseMessage]) -> None:
+        """Add all messages from one turn in a single request"""
+        self._buffer(messages)
+        self.flush()
+    
+    def flush(self) -> None:
+        """Append buffered messages to AgentState"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            self._agent = self._with_reload(lambda: self.client.append_messages(
+                self.agent_id,
+                pending,
+                fields={"last_message_at": time.time()},
+                expected_seq=self._agent['commit_seq']
+            ))
+        except Exception:
+            self._pending = pending + self._pending  # keep for the next flush
+            raise
     
     def clear(self) -> None:
         """Clear all messages"""
-        agent = self.client.get_agent(self.agent_id)
-        updated_body = agent['body'].copy()
-        updated_body['memory']['messages'] = []
-        updated_body['cleared_at'] = time.time()
+        self._pending = []
+        self._msgs_cache = []
         
-        self.client.create_agent(
-            agent_type="langchain-agent",
-            body=updated_body,
-            tags=agent['tags'],
-            agent_id=self.agent_id
-        )
+        def write():
+            return self.client.patch_agent(
+                self.agent_id,
+                [
+                    {"op": "set", "path": "/memory/messages", "value": []},
+                    {"op": "set", "path": "/cleared_at", "value": time.time()}
+                ],
+                expected_seq=self._agent['commit_seq']
+            )
+        
+        self._agent = self._with_reload(write)
+    
+    def _with_reload(self, write):
+        """Run a versioned write; on a version conflict reload the agent and retry once"""
+        try:
+            return write()
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 409:
+                raise
+            self._agent = self.client.get_agent(self.agent_id)
+            self._msgs_cache = None  # someone else changed the agent
+            return write()
+
+
+atexit.register(AgentStateMemory.flush_all)
+
+
+_ALLOWED_CHARS = frozenset('0123456789+-*/(). ')
+_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_expression(expression: str) -> ast.AST:
+    """Parse an arithmetic expression once; repeated tool calls hit the cache"""
+    return ast.parse(expression, mode='eval').body
+
+
+def _eval_node(node: ast.AST):
+    """Evaluate a whitelisted arithmetic AST (numbers and + - * / // only)"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_node(node.operand))
+    raise ValueError("Unsupported expression")
 
 
 def create_calculator_tool():
@@ -142,11 +227,10 @@ def create_calculator_tool():
         """Safely evaluate mathematical expressions"""
         try:
             # Basic safety check
-            allowed_chars = set('0123456789+-*/(). ')
-            if not all(c in allowed_chars for c in expression):
+            if not _ALLOWED_CHARS.issuperset(expression):
                 return "Error: Invalid characters in expression"
             
-            result = eval(expression)
+            result = _eval_node(_compile_expression(expression.strip()))
             return f"Result: {result}"
         except Exception as e:
             return f"Error: {str(e)}"
@@ -158,13 +242,28 @@ def create_calculator_tool():
     )
 
 
+@functools.lru_cache(maxsize=32)
+def _make_prompt(system_prompt: str) -> "ChatPromptTemplate":
+    """Build the agent prompt once per distinct system prompt"""
+    return ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad")
+    ])
+
+
+_FRAMEWORK_TAGS = {"framework": "langchain"}
+_COORD_TAGS = {"type": "coordination", "framework": "langchain"}
+
+
 def create_agent_coordination_tool(agentstate_client: AgentStateClient):
     """Create a tool for agents to coordinate with each other"""
     def coordinate_with_agents(message: str) -> str:
         """Send a coordination message to all agents in the system"""
         try:
             # Get all langchain agents
-            agents = agentstate_client.query_agents({"framework": "langchain"})
+            agents = agentstate_client.query_agents(_FRAMEWORK_TAGS)
             
             # Store coordination message
             coord_msg = agentstate_client.create_agent(
@@ -174,10 +273,7 @@ def create_agent_coordination_tool(agentstate_client: AgentStateClient):
                     "timestamp": time.time(),
                     "sender": "coordination-tool"
                 },
-                tags={
-                    "type": "coordination",
-                    "framework": "langchain"
-                }
+                tags=_COORD_TAGS
             )
             
             return f"Coordination message sent to {len(agents)} agents. Message ID: {coord_msg['id']}"
@@ -194,65 +290,57 @@ def create_agent_coordination_tool(agentstate_client: AgentStateClient):
 class LangChainAgentStateDemo:
     """Demo class for LangChain + AgentState integration"""
     
-    def __init__(self):
-        print("Initializing LangChain + AgentState Demo...")
+    def __init__(self, verbose: bool = True):
+        # verbose=False keeps only errors from the startup sequence
+        self._say = print if verbose else (lambda *args, **kwargs: None)
+        self._say("Initializing LangChain + AgentState Demo...")
         
         # Initialize AgentState client
-        print("Connecting to AgentState...")
+        self._say("Connecting to AgentState...")
         self.agentstate = AgentStateClient(
             base_url=os.getenv('AGENTSTATE_URL', 'http://localhost:8080'),
             namespace='langchain-demo',
-            api_key=os.getenv('AGENTSTATE_API_KEY')
+            api_key=os.getenv('AGENTSTATE_API_KEY'),
+            timeout=5,
+            query_cache_ttl=2.0  # tools and the summary re-run the same lookups within seconds
         )
         
-        # Add timeout to the session
-        self.agentstate.session.timeout = 5  # 5 second timeout
+        # Health check, LLM setup and tool creation are independent; run them
+        # concurrently so the health round trip overlaps ChatOpenAI init
+        self._say("Testing AgentState connection, initializing OpenAI LLM and creating tools...")
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            f_health = executor.submit(self.agentstate.health_check)
+            f_llm = executor.submit(ChatOpenAI, model="gpt-3.5-turbo", temperature=0.7)
+            f_tools = executor.submit(lambda: [
+                create_calculator_tool(),
+                create_agent_coordination_tool(self.agentstate)
+            ])
         
-        # Test AgentState connection with basic HTTP request (skip SDK health_check due to auth header issue)
-        print("Testing AgentState connection...")
-        try:
-            import requests
-            response = requests.get(f"{self.agentstate.base_url}/health", timeout=5)
-            if response.status_code == 200 and response.text.strip() == "ok":
-                print("✅ AgentState connection successful")
-            else:
-                print("⚠️ AgentState health check failed - server returned non-healthy status")
-                print("Make sure AgentState server is running: docker run -p 8080:8080 ayushmi/agentstate:latest")
-                raise Exception("AgentState server not healthy")
-        except Exception as e:
-            print(f"❌ AgentState connection failed: {e}")
+        if not f_health.result():
+            print("❌ AgentState connection failed")
             print("Troubleshooting:")
             print("1. Make sure AgentState server is running: docker-compose up -d")
             print("2. Check if port 8080 is accessible: curl http://localhost:8080/health") 
             print("3. Verify AGENTSTATE_URL environment variable")
-            raise
+            raise Exception("AgentState server not healthy")
+        self._say("✅ AgentState connection successful")
         
-        # Initialize OpenAI (requires OPENAI_API_KEY environment variable)
-        print("Initializing OpenAI LLM...")
         try:
-            self.llm = ChatOpenAI(
-                model="gpt-3.5-turbo",
-                temperature=0.7
-            )
-            print("✅ OpenAI LLM initialized")
+            self.llm = f_llm.result()
+            self._say("✅ OpenAI LLM initialized")
         except Exception as e:
             print(f"❌ Failed to initialize OpenAI LLM: {e}")
             raise
         
-        # Create tools
-        print("Creating tools...")
         try:
-            self.tools = [
-                create_calculator_tool(),
-                create_agent_coordination_tool(self.agentstate)
-            ]
-            print(f"✅ Created {len(self.tools)} tools")
+            self.tools = f_tools.result()
+            self._say(f"✅ Created {len(self.tools)} tools")
         except Exception as e:
             print(f"❌ Failed to create tools: {e}")
             raise
         
         self.agents = {}
-        print("✅ Demo initialization complete!")
+        self._say("✅ Demo initialization complete!")
     
     def create_agent(self, agent_id: str, system_prompt: str):
         """Create a LangChain agent with AgentState memory"""
@@ -272,12 +360,7 @@ class LangChainAgentStateDemo:
             
             # Create prompt template
             print(f"Creating prompt template for {agent_id}")
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("human", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad")
-            ])
+            prompt = _make_prompt(system_prompt)
             
             # Create agent
             print(f"Creating LangChain agent for {agent_id}")
@@ -305,7 +388,6 @@ class LangChainAgentStateDemo:
             
         except Exception as e:
             print(f"❌ Error creating agent {agent_id}: {e}")
-            import traceback
             traceback.print_exc()
             return None
     
@@ -352,9 +434,13 @@ class LangChainAgentStateDemo:
         print(f"Coordinator: {coord_response['output']}")
         
         print("\n📈 Checking AgentState for stored data:")
-        # Query all agents and coordination messages
-        agents = self.agentstate.query_agents({"framework": "langchain"})
-        coord_messages = self.agentstate.query_agents({"type": "coordination"})
+        AgentStateMemory.flush_all()  # stored counts should include buffered messages
+        # Query all agents and coordination messages in one round trip
+        results = self.agentstate.query_agents_multi({
+            "agents": {"framework": "langchain"},
+            "coord": {"type": "coordination"}
+        })
+        agents, coord_messages = results["agents"], results["coord"]
         
         print(f"Total agents in system: {len(agents)}")
         print(f"Coordination messages: {len(coord_messages)}")
@@ -366,26 +452,30 @@ class LangChainAgentStateDemo:
     def cleanup(self):
         """Clean up test agents"""
         print("🧹 Cleaning up demo agents...")
+        AgentStateMemory.flush_all()
         try:
             # Set a shorter timeout for cleanup
-            original_timeout = getattr(self.agentstate.session, 'timeout', None)
-            self.agentstate.session.timeout = 3
-            
-            agents = self.agentstate.query_agents({"framework": "langchain"})
-            print(f"Found {len(agents)} agents to clean up")
+            original_timeout = self.agentstate.timeout
+            self.agentstate.timeout = 3
             
-            for agent in agents:
+            def delete(agent_id):
                 try:
-                    self.agentstate.delete_agent(agent['id'])
-                    print(f"Deleted agent: {agent['id']}")
+                    self.agentstate.delete_agent(agent_id)
+                    print(f"Deleted agent: {agent_id}")
                 except Exception as delete_error:
-                    print(f"Failed to delete agent {agent['id']}: {delete_error}")
+                    print(f"Failed to delete agent {agent_id}: {delete_error}")
+            
+            # Deletes start as agents stream in; the session pool (64) covers 16 workers
+            found = 0
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                for agent in self.agentstate.iter_query_agents(_FRAMEWORK_TAGS):
+                    executor.submit(delete, agent['id'])
+                    found += 1
             
-            print(f"✅ Cleanup completed")
+            print(f"✅ Cleanup completed ({found} agents found)")
             
             # Restore original timeout
-            if original_timeout:
-                self.agentstate.session.timeout = original_timeout
+            self.agentstate.timeout = original_timeout
                 
         except Exception as e:
             print(f"❌ Cleanup error (this is non-critical): {e}")
@@ -8,6 +8,7 @@ Tests basic AgentState integration without requiring OpenAI API key.
 
 import os
 import time
+import traceback
 from agentstate import AgentStateClient
 
 
@@ -19,12 +20,10 @@ def test_agentstate_connection():
     client = AgentStateClient(
         base_url=os.getenv('AGENTSTATE_URL', 'http://localhost:8080'),
         namespace='integration-test',
-        api_key=os.getenv('AGENTSTATE_API_KEY')
+        api_key=os.getenv('AGENTSTATE_API_KEY'),
+        timeout=5
     )
     
-    # Add timeout
-    client.session.timeout = 5
-    
     # Test health check
     print("Testing health check...")
     try:
@@ -59,14 +58,26 @@ def test_agentstate_connection():
     retrieved_agent = client.get_agent(agent_id)
     print(f"✅ Retrieved agent: {retrieved_agent['id']}")
     
-    # Test agent update
-    print("Testing agent update...")
-    updated_body = retrieved_agent['body'].copy()
-    updated_body['memory']['messages'].append({
+    # Test message append (the path AgentStateMemory uses)
+    print("Testing message append...")
+    appended_agent = client.append_messages(agent_id, [{
         "type": "test",
         "content": "Test message",
         "timestamp": time.time()
-    })
+    }])
+    assert len(appended_agent['body']['memory']['messages']) == 1
+    print(f"✅ Appended message to agent: {appended_agent['id']}")
+    
+    # Test full-body update
+    print("Testing agent update...")
+    updated_body = dict(appended_agent['body'])
+    updated_body['memory'] = {
+        "messages": appended_agent['body']['memory']['messages'] + [{
+            "type": "test",
+            "content": "Second message",
+            "timestamp": time.time()
+        }]
+    }
     
     updated_agent = client.create_agent(
         agent_type="test-agent",
@@ -74,6 +85,7 @@ def test_agentstate_connection():
         tags=retrieved_agent['tags'],
         agent_id=agent_id
     )
+    assert len(updated_agent['body']['memory']['messages']) == 2
     print(f"✅ Updated agent: {updated_agent['id']}")
     
     # Test agent query
@@ -95,5 +107,4 @@ if __name__ == "__main__":
         test_agentstate_connection()
     except Exception as e:
         print(f"❌ Integration test failed: {e}")
-        import traceback
         traceback.print_exc()
\ No newline at end of file
@@ -1,46 +1,61 @@
 #!/usr/bin/env python3
 """Minimal test to identify where it hangs"""
 
-print("Starting minimal test...")
+import asyncio
+import logging
+import sys
 
-try:
-    print("1. Importing agentstate...")
-    from agentstate import AgentStateClient
-    print("   ✅ Import successful")
-    
-    print("2. Creating client...")
-    client = AgentStateClient(
+# StreamHandler flushes every record, so output appears before a potential hang
+logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
+log = logging.getLogger("minimal_test")
+
+
+async def probe():
+    from agentstate import AsyncAgentStateClient
+
+    # Health check and create run concurrently over one pooled session
+    async with AsyncAgentStateClient(
         base_url='http://localhost:8080',
-        namespace='integration-test'
-    )
-    print("   ✅ Client created")
-    
-    print("3. Setting timeout...")
-    client.session.timeout = 3
-    print("   ✅ Timeout set")
-    
-    print("4. Testing health check...")
-    import sys
-    sys.stdout.flush()  # Force output before potential hang
-    
-    health = client.health_check()
-    print(f"   ✅ Health check result: {health}")
-    
-    if health:
-        print("5. Testing simple create_agent...")
-        agent = client.create_agent(
-            agent_type="test",
-            body={"test": True}
+        namespace='integration-test',
+        max_connections=16
+    ) as client:
+        log.info("2. Probing health check and create_agent concurrently...")
+        health, agent = await asyncio.gather(
+            client.health_check(),
+            client.create_agent(agent_type="test", body={"test": True}),
+            return_exceptions=True
         )
-        print(f"   ✅ Agent created: {agent['id']}")
-        
-        print("6. Cleanup...")
-        client.delete_agent(agent['id'])
-        print("   ✅ Agent deleted")
-    
-    print("All tests passed!")
-    
+
+        try:
+            for name, result in (("health_check", health), ("create_agent", agent)):
+                if isinstance(result, BaseException):
+                    log.error(f"   ❌ {name} failed: {result}")
+                    return False
+            if not health:
+                log.error("   ❌ Health check failed: server reported unhealthy")
+                return False
+            log.info(f"   ✅ Health check result: {health}")
+            log.info(f"   ✅ Agent created: {agent['id']}")
+            return True
+        finally:
+            # The agent may exist even when the health check failed
+            if not isinstance(agent, BaseException):
+                log.info("3. Cleanup...")
+                await client.delete_agent(agent['id'])
+                log.info("   ✅ Agent deleted")
+
+
+log.info("Starting minimal test...")
+
+try:
+    log.info("1. Importing agentstate...")
+    import agentstate
+    if agentstate.AsyncAgentStateClient is None:
+        raise ImportError("AsyncAgentStateClient requires httpx (pip install agentstate[async])")
+    log.info("   ✅ Import successful")
+
+    if asyncio.run(probe()):
+        log.info("All tests passed!")
+
 except Exception as e:
-    print(f"❌ Error: {e}")
-    import traceback
-    traceback.print_exc()
\ No newline at end of file
+    log.exception(f"❌ Error: {e}")
@@ -1,38 +1,63 @@
 #!/usr/bin/env python3
 """Debug AgentState connection step by step"""
 
-import requests
-import time
+import asyncio
+import logging
+import sys
 
-print("1. Testing direct HTTP call...")
-try:
-    response = requests.get("http://localhost:8080/health", timeout=5)
-    print(f"   Status: {response.status_code}")
-    print(f"   Content: {response.text}")
-except Exception as e:
-    print(f"   Error: {e}")
+import httpx
 
-print("\n2. Testing AgentState import...")
-try:
-    from agentstate import AgentStateClient
-    print("   Import successful")
-except Exception as e:
-    print(f"   Import error: {e}")
+logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(message)s")
+log = logging.getLogger("simple_debug")
+
+URL = "http://localhost:8080"
+
+
+async def sweep(client):
+    """Probe the server directly and through the SDK at the same time"""
+    async with httpx.AsyncClient(timeout=3) as raw:
+        direct, sdk_health = await asyncio.gather(
+            raw.get(f"{URL}/health"),
+            client.health_check(),
+            return_exceptions=True
+        )
 
-print("\n3. Testing AgentState client initialization...")
+    log.info("\n3. Direct HTTP call:")
+    if isinstance(direct, BaseException):
+        log.info(f"   Error: {direct}")
+    else:
+        log.info(f"   Status: {direct.status_code}")
+        log.info(f"   Content: {direct.text}")
+
+    log.info("\n4. SDK health check:")
+    if isinstance(sdk_health, BaseException):
+        log.info(f"   Health check error: {sdk_health}")
+    else:
+        log.info(f"   Health check result: {sdk_health}")
+
+
+log.info("1. Testing AgentState import...")
 try:
-    client = AgentStateClient(
-        base_url='http://localhost:8080',
-        namespace='debug-test'
-    )
-    print("   Client initialized")
+    from agentstate import AsyncAgentStateClient
+    if AsyncAgentStateClient is None:
+        raise ImportError("AsyncAgentStateClient requires httpx (pip install agentstate[async])")
+    log.info("   Import successful")
 except Exception as e:
-    print(f"   Client init error: {e}")
+    log.info(f"   Import error: {e}")
+    sys.exit(1)
 
-print("\n4. Testing health check with timeout...")
+log.info("\n2. Testing AgentState client initialization...")
 try:
-    client.session.timeout = 3
-    health = client.health_check()
-    print(f"   Health check result: {health}")
+    client = AsyncAgentStateClient(base_url=URL, namespace='debug-test')
+    log.info("   Client initialized")
 except Exception as e:
-    print(f"   Health check error: {e}")
\ No newline at end of file
+    log.info(f"   Client init error: {e}")
+    sys.exit(1)
+
+
+async def main():
+    async with client:
+        await sweep(client)
+
+
+asyncio.run(main())
@@ -4,22 +4,32 @@ import grpc
 import agentstate_pb2 as pb
 import agentstate_pb2_grpc as pbg
 
+# One long-lived channel; keepalive pings keep idle watch streams from being
+# dropped by intermediaries, so reconnects only re-issue the Watch call.
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", 16 * 1024 * 1024),
+]
 
-async def watch(ns: str, from_commit: int, endpoint: str):
-    async with grpc.aio.insecure_channel(endpoint) as channel:
-        stub = pbg.AgentStateStub(channel)
-        req = pb.WatchRequest(ns=ns, from_commit=from_commit)
-        last = from_commit
-        try:
-            async for ev in stub.Watch(req):
+
+async def watch(stub: pbg.AgentStateStub, ns: str, from_commit: int):
+    req = pb.WatchRequest(ns=ns, from_commit=from_commit)
+    last = from_commit
+    try:
+        # WatchBatch groups buffered events per message; same events as Watch
+        async for batch in stub.WatchBatch(req):
+            for ev in batch.events:
                 if ev.type == "put":
                     print("PUT", ev.commit, ev.id)
                 else:
                     print("DEL", ev.commit, ev.id)
                 last = ev.commit
-        except grpc.aio.AioRpcError as e:
-            print("stream closed:", e)
-            return last
+    except grpc.aio.AioRpcError as e:
+        print("stream closed:", e)
+    return last
 
 
 async def main():
@@ -30,11 +40,14 @@ async def main():
     args = ap.parse_args()
     backoff = 1
     last = args.from_commit
-    while True:
-        last = await watch(args.ns, last, args.endpoint)
-        await asyncio.sleep(backoff)
-        backoff = min(30, backoff * 2)
+    async with grpc.aio.insecure_channel(args.endpoint, options=CHANNEL_OPTIONS) as channel:
+        stub = pbg.AgentStateStub(channel)
+        while True:
+            resumed = await watch(stub, args.ns, last)
+            # Back off only while the stream makes no progress
+            backoff = 1 if resumed != last else min(30, backoff * 2)
+            last = resumed
+            await asyncio.sleep(backoff)
 
 if __name__ == '__main__':
     asyncio.run(main())
-
@@ -20,7 +20,12 @@ pub struct VectorQuery {
 
 #[derive(Debug, Clone, Serialize, Deserialize, Default)]
 pub struct QueryRequest {
+    // SDKs send this as "tags"
+    #[serde(alias = "tags")]
     pub tag_filter: Option<TagFilter>,
+    // Exact object type match, applied during the scan
+    #[serde(default)]
+    pub r#type: Option<String>,
     pub jsonpath: Option<JsonPathFilter>,
     pub vector: Option<VectorQuery>,
     pub limit: Option<usize>,
@@ -98,6 +98,8 @@ async fn main() -> anyhow::Result<()> {
     let sweeper_state = state.clone();
     let snapshot_state = state.clone();
     let grpc_state = state.clone();
+    #[cfg(unix)]
+    let uds_state = state.clone();
 
     // Metrics registry (MVP)
     static REGISTRY: Lazy<Registry> = Lazy::new(Registry::new);
@@ -153,8 +155,15 @@ async fn main() -> anyhow::Result<()> {
     let app = Router::new()
         .route("/health", get(health))
         .route("/v1/:ns/objects", post(put_objects))
-        .route("/v1/:ns/objects/:id", get(get_object).delete(delete_object))
+        .route(
+            "/v1/:ns/objects/:id",
+            get(get_object).delete(delete_object).patch(patch_object),
+        )
+        .route("/v1/:ns/objects/:id/append", post(append_object))
+        .route("/v1/:ns/batch", post(batch_objects))
         .route("/v1/:ns/query", post(query))
+        .route("/v1/:ns/query/multi", post(query_multi))
+        .route("/v1/:ns/commit", get(head_commit))
         .route("/v1/:ns/watch", get(watch_sse))
         .route("/v1/:ns/lease/acquire", post(lease_acquire))
         .route("/v1/:ns/lease/renew", post(lease_renew))
@@ -274,6 +283,24 @@ async fn main() -> anyhow::Result<()> {
         })
     };
 
+    // Optional same-host gRPC listener on a Unix socket (no TCP stack), e.g. for local tests
+    #[cfg(unix)]
+    if let Ok(path) = std::env::var("GRPC_UDS_PATH") {
+        let _ = std::fs::remove_file(&path);
+        let uds = tokio::net::UnixListener::bind(&path)?;
+        info!("grpc listening on unix:{}", path);
+        let svc = AgentStateGrpc { state: uds_state };
+        tokio::spawn(async move {
+            GrpcServer::builder()
+                .add_service(agentstate_v1::agent_state_server::AgentStateServer::new(
+                    svc,
+                ))
+                .serve_with_incoming(tokio_stream::wrappers::UnixListenerStream::new(uds))
+                .await
+                .unwrap();
+        });
+    }
+
     tokio::try_join!(http, grpc).map(|_| ())?;
     Ok(())
 }
@@ -314,52 +341,27 @@ async fn put_objects(
     if let Err(resp) = rate_limit(&app, &claims) {
         return resp.into_response();
     }
-    // Region pin
-    if let Some(reg) = claims.get("region").and_then(|v| v.as_str()) {
-        if let Ok(srv) = std::env::var("REGION") {
-            if !srv.is_empty() && srv != reg {
-                return (
-                    StatusCode::UNAVAILABLE_FOR_LEGAL_REASONS,
-                    Json(json!({"error":"region_mismatch"})),
-                )
-                    .into_response();
-            }
-        }
-    }
-    // Size limits
-    if let Some(maxb) = claims.get("max_bytes").and_then(|v| v.as_u64()) {
-        if let Some(cl) = headers
-            .get("content-length")
-            .and_then(|v| v.to_str().ok())
-            .and_then(|s| s.parse::<u64>().ok())
-        {
-            if cl > maxb {
-                return (
-                    StatusCode::PAYLOAD_TOO_LARGE,
-                    Json(json!({"error":"too_large"})),
-                )
-                    .into_response();
-            }
-        }
+    let content_length = headers
+        .get("content-length")
+        .and_then(|v| v.to_str().ok())
+        .and_then(|s| s.parse::<u64>().ok());
+    if let Err(resp) = check_write_claims(&claims, content_length) {
+        return resp.into_response();
     }
-    // Optional lease fencing
-    if let Some(resource) = headers.get("If-Resource").and_then(|v| v.to_str().ok()) {
-        match headers
-            .get("If-Fence")
+    // Optional optimistic concurrency: If-Match carries the expected commit_seq
+    let if_match = headers
+        .get("If-Match")
+        .and_then(|v| v.to_str().ok())
+        .and_then(|s| s.trim_matches('"').parse::<u64>().ok());
+    // Create-if-absent: with If-None-Match: * an existing object is returned as-is
+    let create_only = req.id.is_some()
+        && headers
+            .get("If-None-Match")
             .and_then(|v| v.to_str().ok())
-            .and_then(|s| s.parse::<u64>().ok())
-        {
-            Some(f) => {
-                if let Err(e) = app.store.validate_fence(&ns, resource, f).await {
-                    return (StatusCode::CONFLICT, Json(json!({"error": e.to_string()})))
-                        .into_response();
-                }
-            }
-            None => {
-                return (StatusCode::CONFLICT, Json(json!({"error":"missing fence"})))
-                    .into_response()
-            }
-        }
+            .map(|s| s.trim() == "*")
+            .unwrap_or(false);
+    if let Err(resp) = check_fence(&app, &ns, &headers).await {
+        return resp.into_response();
     }
     let _timer = {
         // local static
@@ -372,62 +374,81 @@ async fn put_objects(
         });
         OP_DURATION.with_label_values(&["put"]).start_timer()
     };
-    // Idempotency key support
-    if let Some(key) = headers.get("Idempotency-Key").and_then(|v| v.to_str().ok()) {
+    // Idempotency key support: a retry of a write that already succeeded replays the
+    // stored response before any precondition is evaluated against the new state
+    let idem = headers
+        .get("Idempotency-Key")
+        .and_then(|v| v.to_str().ok())
+        .map(|key| {
+            let body_hash =
+                agentstate_core::util::blake3_hex(serde_json::to_vec(&req).unwrap().as_slice());
+            (key, body_hash)
+        });
+    if let Some((key, body_hash)) = &idem {
         // persisted idempotency
-        let body_hash =
-            agentstate_core::util::blake3_hex(serde_json::to_vec(&req).unwrap().as_slice());
-        if let Ok(Some(rec)) = app.store.idempotency_lookup(&ns, key, &body_hash).await {
+        if let Ok(Some(rec)) = app.store.idempotency_lookup(&ns, key, body_hash).await {
             return (StatusCode::OK, Json(rec.response)).into_response();
         }
-        match app.store.put(&ns, req).await {
-            Ok(obj) => {
-                let val = serde_json::to_value(&obj).unwrap_or(json!({"id": obj.id}));
+    }
+    let id = req.id.clone();
+    // Preconditions are checked atomically with the write (compare-and-put)
+    let res = if let Some(expected) = if_match {
+        app.store.put_if(&ns, req, Some(expected)).await
+    } else if create_only {
+        app.store.put_if(&ns, req, None).await
+    } else {
+        app.store.put(&ns, req).await
+    };
+    match res {
+        Ok(obj) => {
+            let val = serde_json::to_value(&obj).unwrap_or(json!({"id": obj.id}));
+            if let Some((key, body_hash)) = &idem {
                 let _ = app
                     .store
                     .idempotency_commit(
                         &ns,
                         key,
-                        &body_hash,
+                        body_hash,
                         val.clone(),
                         obj.commit_seq,
                         chrono::Utc::now() + chrono::Duration::minutes(10),
                     )
                     .await;
-                {
-                    static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
-                        IntCounterVec::new(
-                            prometheus::opts!("agentstate_ops_total", "ops"),
-                            &["op"],
-                        )
-                        .unwrap()
-                    });
-                    OPS_TOTAL.with_label_values(&["put"]).inc();
-                }
-                (StatusCode::OK, Json(val)).into_response()
             }
-            Err(e) => (
-                StatusCode::BAD_REQUEST,
-                Json(json!({"error": e.to_string()})),
-            )
-                .into_response(),
+            static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
+                IntCounterVec::new(prometheus::opts!("agentstate_ops_total", "ops"), &["op"])
+                    .unwrap()
+            });
+            OPS_TOTAL.with_label_values(&["put"]).inc();
+            (StatusCode::OK, Json(val)).into_response()
         }
-    } else {
-        match app.store.put(&ns, req).await {
-            Ok(obj) => {
-                static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
-                    IntCounterVec::new(prometheus::opts!("agentstate_ops_total", "ops"), &["op"])
-                        .unwrap()
-                });
-                OPS_TOTAL.with_label_values(&["put"]).inc();
-                (StatusCode::OK, Json(obj)).into_response()
+        Err(agentstate_core::StateError::Conflict(_)) if if_match.is_some() || create_only => {
+            let current = match id.as_deref() {
+                Some(id) => app
+                    .store
+                    .get(
+                        &ns,
+                        id,
+                        agentstate_storage::traits::GetOptions { at_ts: None },
+                    )
+                    .await
+                    .ok(),
+                None => None,
+            };
+            match current {
+                Some(existing) if create_only => (StatusCode::OK, Json(existing)).into_response(),
+                current => (
+                    StatusCode::CONFLICT,
+                    Json(json!({"error": "version_mismatch", "commit_seq": current.map(|o| o.commit_seq)})),
+                )
+                    .into_response(),
             }
-            Err(e) => (
-                StatusCode::BAD_REQUEST,
-                Json(json!({"error": e.to_string()})),
-            )
-                .into_response(),
         }
+        Err(e) => (
+            StatusCode::BAD_REQUEST,
+            Json(json!({"error": e.to_string()})),
+        )
+            .into_response(),
     }
 }
 
@@ -490,6 +511,397 @@ async fn delete_object(
     }
 }
 
+#[derive(serde::Deserialize)]
+struct AppendReq {
+    // Dot-separated path to an array inside the body, e.g. "memory.messages"
+    path: String,
+    #[serde(default)]
+    items: Vec<serde_json::Value>,
+    // Top-level body fields to overwrite in the same write
+    #[serde(default)]
+    set: serde_json::Map<String, serde_json::Value>,
+    // Reject with 409 unless the object is still at this commit_seq
+    #[serde(default)]
+    expected_seq: Option<u64>,
+}
+
+#[derive(Clone, serde::Deserialize)]
+struct PatchOp {
+    // "set" | "remove" | "append" (one value) | "extend" (array of values)
+    op: String,
+    // JSON pointer into the body, e.g. "/memory/messages"
+    path: String,
+    #[serde(default)]
+    value: serde_json::Value,
+}
+
+#[derive(serde::Deserialize)]
+struct PatchReq {
+    ops: Vec<PatchOp>,
+    #[serde(default)]
+    expected_seq: Option<u64>,
+}
+
+// Walk (and create) nested objects down to `segs`, returning the target slot
+fn body_slot<'a>(
+    body: &'a mut serde_json::Value,
+    segs: &[String],
+) -> Result<&'a mut serde_json::Value, &'static str> {
+    let mut cur = body;
+    for seg in segs {
+        if cur.is_null() {
+            *cur = json!({});
+        }
+        cur = match cur {
+            serde_json::Value::Object(m) => m.entry(seg.clone()).or_insert(serde_json::Value::Null),
+            _ => return Err("path_not_object"),
+        };
+    }
+    Ok(cur)
+}
+
+fn extend_slot(
+    slot: &mut serde_json::Value,
+    items: Vec<serde_json::Value>,
+) -> Result<(), &'static str> {
+    if slot.is_null() {
+        *slot = serde_json::Value::Array(Vec::new());
+    }
+    match slot {
+        serde_json::Value::Array(a) => {
+            a.extend(items);
+            Ok(())
+        }
+        _ => Err("path_not_array"),
+    }
+}
+
+// Extend the array at `path`, creating missing objects/arrays along the way
+fn append_at_path(
+    body: &mut serde_json::Value,
+    path: &str,
+    items: Vec<serde_json::Value>,
+) -> Result<(), &'static str> {
+    let segs: Vec<String> = path
+        .split('.')
+        .filter(|s| !s.is_empty())
+        .map(String::from)
+        .collect();
+    extend_slot(body_slot(body, &segs)?, items)
+}
+
+fn apply_patch_op(body: &mut serde_json::Value, op: PatchOp) -> Result<(), &'static str> {
+    if !op.path.is_empty() && !op.path.starts_with('/') {
+        return Err("invalid_path");
+    }
+    let segs: Vec<String> = op
+        .path
+        .split('/')
+        .skip(1)
+        .map(|s| s.replace("~1", "/").replace("~0", "~"))
+        .collect();
+    match op.op.as_str() {
+        "set" => *body_slot(body, &segs)? = op.value,
+        "append" => extend_slot(body_slot(body, &segs)?, vec![op.value])?,
+        "extend" => match op.value {
+            serde_json::Value::Array(items) => extend_slot(body_slot(body, &segs)?, items)?,
+            _ => return Err("value_not_array"),
+        },
+        "remove" => {
+            let (key, parents) = segs.split_last().ok_or("invalid_path")?;
+            let mut cur = &mut *body;
+            for seg in parents {
+                cur = match cur.get_mut(seg.as_str()) {
+                    Some(v) => v,
+                    None => return Ok(()),
+                };
+            }
+            if let Some(m) = cur.as_object_mut() {
+                m.remove(key);
+            }
+        }
+        _ => return Err("unsupported_op"),
+    }
+    Ok(())
+}
+
+// Read-modify-write of an object's body, keeping its type, tags and TTL. The write is a
+// compare-and-put against the version that was read; if another writer got in first the
+// edit is re-applied to the new version (or 409 when the caller pinned expected_seq).
+async fn rewrite_object<F>(
+    app: &AppState,
+    ns: &str,
+    id: &str,
+    headers: &HeaderMap,
+    op: &str,
+    expected_seq: Option<u64>,
+    edit: F,
+) -> axum::response::Response
+where
+    F: Fn(&mut serde_json::Value) -> Result<(), &'static str>,
+{
+    let claims = match enforce_caps(headers, ns, "put") {
+        Ok(c) => c,
+        Err(resp) => return resp.into_response(),
+    };
+    if let Err(resp) = rate_limit(app, &claims) {
+        return resp.into_response();
+    }
+    let _timer = {
+        static OP_DURATION: Lazy<HistogramVec> = Lazy::new(|| {
+            HistogramVec::new(
+                prometheus::opts!("op_duration_seconds", "op durations").into(),
+                &["op"],
+            )
+            .unwrap()
+        });
+        OP_DURATION.with_label_values(&[op]).start_timer()
+    };
+    if let Err(resp) = check_fence(app, ns, headers).await {
+        return resp.into_response();
+    }
+    const MAX_ATTEMPTS: usize = 16;
+    for _ in 0..MAX_ATTEMPTS {
+        let obj = match app
+            .store
+            .get(
+                ns,
+                id,
+                agentstate_storage::traits::GetOptions { at_ts: None },
+            )
+            .await
+        {
+            Ok(o) => o,
+            Err(e) => {
+                return (StatusCode::NOT_FOUND, Json(json!({"error": e.to_string()})))
+                    .into_response()
+            }
+        };
+        if let Some(seq) = expected_seq {
+            if seq != obj.commit_seq {
+                return (
+                    StatusCode::CONFLICT,
+                    Json(json!({"error": "version_mismatch", "commit_seq": obj.commit_seq})),
+                )
+                    .into_response();
+            }
+        }
+        let mut body = obj.body;
+        if let Err(e) = edit(&mut body) {
+            return (StatusCode::BAD_REQUEST, Json(json!({"error": e}))).into_response();
+        }
+        let size = serde_json::to_vec(&body).map(|v| v.len() as u64).ok();
+        if let Err(resp) = check_write_claims(&claims, size) {
+            return resp.into_response();
+        }
+        let put = PutRequest {
+            r#type: obj.r#type,
+            body,
+            tags: obj.tags,
+            ttl_seconds: obj.ttl_seconds,
+            id: Some(obj.id),
+            parents: Vec::new(),
+        };
+        match app.store.put_if(ns, put, Some(obj.commit_seq)).await {
+            Ok(obj) => {
+                static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
+                    IntCounterVec::new(prometheus::opts!("agentstate_ops_total", "ops"), &["op"])
+                        .unwrap()
+                });
+                OPS_TOTAL.with_label_values(&[op]).inc();
+                return (StatusCode::OK, Json(obj)).into_response();
+            }
+            // Lost the race: re-read and re-apply, unless the caller pinned a version
+            Err(agentstate_core::StateError::Conflict(_)) if expected_seq.is_none() => continue,
+            Err(agentstate_core::StateError::Conflict(_)) => {
+                return (
+                    StatusCode::CONFLICT,
+                    Json(json!({"error": "version_mismatch"})),
+                )
+                    .into_response()
+            }
+            Err(e) => {
+                return (
+                    StatusCode::BAD_REQUEST,
+                    Json(json!({"error": e.to_string()})),
+                )
+                    .into_response()
+            }
+        }
+    }
+    (
+        StatusCode::CONFLICT,
+        Json(json!({"error": "contended", "attempts": MAX_ATTEMPTS})),
+    )
+        .into_response()
+}
+
+async fn append_object(
+    State(app): State<AppState>,
+    Path((ns, id)): Path<(String, String)>,
+    headers: HeaderMap,
+    Json(req): Json<AppendReq>,
+) -> impl IntoResponse {
+    let AppendReq {
+        path,
+        items,
+        set,
+        expected_seq,
+    } = req;
+    rewrite_object(&app, &ns, &id, &headers, "append", expected_seq, |body| {
+        append_at_path(body, &path, items.clone())?;
+        if !set.is_empty() {
+            body.as_object_mut()
+                .ok_or("body_not_object")?
+                .extend(set.clone());
+        }
+        Ok(())
+    })
+    .await
+}
+
+async fn patch_object(
+    State(app): State<AppState>,
+    Path((ns, id)): Path<(String, String)>,
+    headers: HeaderMap,
+    Json(req): Json<PatchReq>,
+) -> impl IntoResponse {
+    rewrite_object(
+        &app,
+        &ns,
+        &id,
+        &headers,
+        "patch",
+        req.expected_seq,
+        |body| {
+            for op in req.ops.iter().cloned() {
+                apply_patch_op(body, op)?;
+            }
+            Ok(())
+        },
+    )
+    .await
+}
+
+#[derive(serde::Deserialize)]
+struct BatchReq {
+    #[serde(default)]
+    puts: Vec<PutRequest>,
+    #[serde(default)]
+    deletes: Vec<String>,
+    // Delete every object matching these tags (resolved server-side in the same batch)
+    #[serde(default)]
+    delete_where: Option<agentstate_core::TagFilter>,
+}
+
+async fn batch_objects(
+    State(app): State<AppState>,
+    Path(ns): Path<String>,
+    headers: HeaderMap,
+    Json(req): Json<BatchReq>,
+) -> impl IntoResponse {
+    // An empty tag filter matches every object; never let it wipe a namespace
+    if req.delete_where.as_ref().map_or(false, |f| f.0.is_empty()) {
+        return (
+            StatusCode::BAD_REQUEST,
+            Json(json!({"error": "delete_where requires at least one tag"})),
+        )
+            .into_response();
+    }
+    let mut claims = None;
+    if !req.puts.is_empty() {
+        match enforce_caps(&headers, &ns, "put") {
+            Ok(c) => claims = Some(c),
+            Err(resp) => return resp.into_response(),
+        }
+    }
+    if !req.deletes.is_empty() || req.delete_where.is_some() {
+        match enforce_caps(&headers, &ns, "delete") {
+            Ok(c) => {
+                claims.get_or_insert(c);
+            }
+            Err(resp) => return resp.into_response(),
+        }
+    }
+    if let Some(claims) = &claims {
+        // One token per object written or deleted, plus one for resolving delete_where
+        let cost = req.puts.len() + req.deletes.len() + req.delete_where.is_some() as usize;
+        if let Err(resp) = rate_limit_n(&app, claims, cost as u64) {
+            return resp.into_response();
+        }
+        // Each put is checked as a single put would be: region and size per item
+        for put in &req.puts {
+            let size = serde_json::to_vec(put).map(|v| v.len() as u64).ok();
+            if let Err(resp) = check_write_claims(claims, size) {
+                return resp.into_response();
+            }
+        }
+        if !req.puts.is_empty() {
+            if let Err(resp) = check_fence(&app, &ns, &headers).await {
+                return resp.into_response();
+            }
+        }
+    }
+    let _timer = {
+        static OP_DURATION: Lazy<HistogramVec> = Lazy::new(|| {
+            HistogramVec::new(
+                prometheus::opts!("op_duration_seconds", "op durations").into(),
+                &["op"],
+            )
+            .unwrap()
+        });
+        OP_DURATION.with_label_values(&["batch"]).start_timer()
+    };
+    static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
+        IntCounterVec::new(prometheus::opts!("agentstate_ops_total", "ops"), &["op"]).unwrap()
+    });
+    let puts = req.puts.len() as u64;
+    let objects = match app.store.put_many(&ns, req.puts).await {
+        Ok(objs) => objs,
+        Err(e) => {
+            return (
+                StatusCode::BAD_REQUEST,
+                Json(json!({"error": e.to_string()})),
+            )
+                .into_response()
+        }
+    };
+    OPS_TOTAL.with_label_values(&["put"]).inc_by(puts);
+    let mut deletes = req.deletes;
+    if let Some(filter) = req.delete_where {
+        let q = QueryRequest {
+            tag_filter: Some(filter),
+            ..Default::default()
+        };
+        match app.store.query(&ns, q).await {
+            Ok(list) => deletes.extend(list.into_iter().map(|o| o.id)),
+            Err(e) => {
+                return (
+                    StatusCode::BAD_REQUEST,
+                    Json(json!({"error": e.to_string(), "objects": objects})),
+                )
+                    .into_response()
+            }
+        }
+    }
+    let deleted = match app.store.delete_many(&ns, &deletes).await {
+        Ok(ids) => ids,
+        Err(e) => {
+            return (
+                StatusCode::BAD_REQUEST,
+                Json(json!({"error": e.to_string(), "objects": objects})),
+            )
+                .into_response()
+        }
+    };
+    let not_found: Vec<&String> = deletes.iter().filter(|id| !deleted.contains(id)).collect();
+    (
+        StatusCode::OK,
+        Json(json!({"objects": objects, "deleted": deleted, "not_found": not_found})),
+    )
+        .into_response()
+}
+
 async fn query(
     State(app): State<AppState>,
     Path(ns): Path<String>,
@@ -509,6 +921,9 @@ async fn query(
         });
         OP_DURATION.with_label_values(&["query"]).start_timer()
     };
+    // Read before querying: the result reflects at least this commit, so
+    // clients can reuse it while /commit still reports the same value
+    let head = app.store.head_commit(&ns);
     match app.store.query(&ns, req).await {
         Ok(list) => {
             static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
@@ -516,7 +931,12 @@ async fn query(
                     .unwrap()
             });
             OPS_TOTAL.with_label_values(&["query"]).inc();
-            (StatusCode::OK, Json(list)).into_response()
+            (
+                StatusCode::OK,
+                [("x-commit-seq", head.to_string())],
+                Json(list),
+            )
+                .into_response()
         }
         Err(e) => (
             StatusCode::BAD_REQUEST,
@@ -526,14 +946,97 @@ async fn query(
     }
 }
 
+async fn head_commit(
+    State(app): State<AppState>,
+    Path(ns): Path<String>,
+    headers: HeaderMap,
+) -> impl IntoResponse {
+    if let Err(resp) = enforce_caps(&headers, &ns, "query") {
+        return resp.into_response();
+    }
+    let head = app.store.head_commit(&ns);
+    (
+        StatusCode::OK,
+        [("x-commit-seq", head.to_string())],
+        Json(json!({"commit_seq": head})),
+    )
+        .into_response()
+}
+
+#[derive(serde::Deserialize)]
+struct MultiQueryReq {
+    // Named queries answered together: {"agents": {...}, "coord": {...}}
+    queries: std::collections::BTreeMap<String, QueryRequest>,
+}
+
+async fn query_multi(
+    State(app): State<AppState>,
+    Path(ns): Path<String>,
+    headers: HeaderMap,
+    Json(req): Json<MultiQueryReq>,
+) -> impl IntoResponse {
+    if let Err(resp) = enforce_caps(&headers, &ns, "query") {
+        return resp.into_response();
+    }
+    let _timer = {
+        static OP_DURATION: Lazy<HistogramVec> = Lazy::new(|| {
+            HistogramVec::new(
+                prometheus::opts!("op_duration_seconds", "op durations").into(),
+                &["op"],
+            )
+            .unwrap()
+        });
+        OP_DURATION
+            .with_label_values(&["query_multi"])
+            .start_timer()
+    };
+    let n = req.queries.len() as u64;
+    let mut out = serde_json::Map::with_capacity(req.queries.len());
+    for (name, q) in req.queries {
+        match app.store.query(&ns, q).await {
+            Ok(list) => {
+                out.insert(name, json!(list));
+            }
+            Err(e) => {
+                return (
+                    StatusCode::BAD_REQUEST,
+                    Json(json!({"error": e.to_string(), "query": name})),
+                )
+                    .into_response()
+            }
+        }
+    }
+    static OPS_TOTAL: Lazy<IntCounterVec> = Lazy::new(|| {
+        IntCounterVec::new(prometheus::opts!("agentstate_ops_total", "ops"), &["op"]).unwrap()
+    });
+    OPS_TOTAL.with_label_values(&["query"]).inc_by(n);
+    (StatusCode::OK, Json(out)).into_response()
+}
+
+#[derive(serde::Deserialize)]
+struct WatchOpts {
+    from_commit: Option<u64>,
+}
+
 async fn watch_sse(
     State(app): State<AppState>,
     Path(ns): Path<String>,
+    q: Option<Query<WatchOpts>>,
     headers: HeaderMap,
 ) -> impl IntoResponse {
     if let Err(resp) = enforce_caps(&headers, &ns, "watch") {
         return resp.into_response();
     }
+    // Resume point: the standard SSE Last-Event-ID header (sent on reconnect),
+    // else ?from_commit=; events up to and including it are not re-sent
+    let from_commit = headers
+        .get("last-event-id")
+        .and_then(|v| v.to_str().ok())
+        .and_then(|v| v.trim().parse::<u64>().ok())
+        .or_else(|| q.and_then(|Query(o)| o.from_commit));
+    if from_commit.is_some() {
+        WATCH_RESUMES_TOTAL.with_label_values(&["sse"]).inc();
+    }
     // Manual SSE stream with decrement on drop
     struct ClientGuard(&'static str);
     impl ClientGuard {
@@ -550,7 +1053,7 @@ async fn watch_sse(
 
     let mut handle = app.store.subscribe(
         agentstate_storage::traits::WatchFilter { ns: ns.clone() },
-        None,
+        from_commit,
     );
     let guard = ClientGuard::inc("sse");
     let s = async_stream::stream! {
@@ -562,23 +1065,32 @@ async fn watch_sse(
                 let chunk = format!("id: {}\ndata: {}\n\n", last, payload);
                 yield Ok::<Bytes, std::io::Error>(Bytes::from(chunk));
                 break;
-            } else if let Some(ev) = handle.try_next() {
-                match ev {
-                    agentstate_storage::traits::WatchEvent::Put(o) => {
-                        WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
-                        let lag = (chrono::Utc::now() - o.ts).num_milliseconds() as f64 / 1000.0;
-                        metrics::WATCH_EMIT_LAG_SEC.observe(lag.max(0.0));
-                        let payload = serde_json::to_string(&json!({"type":"put","obj":o,"commit_seq":o.commit_seq})).unwrap();
-                        let chunk = format!("id: {}\ndata: {}\n\n", o.commit_seq, payload);
-                        yield Ok::<Bytes, std::io::Error>(Bytes::from(chunk));
+            } else if let Some(first) = handle.try_next() {
+                // Coalesce already-buffered events into one chunk (one write per batch)
+                let mut chunk = String::new();
+                let mut next = Some(first);
+                let mut n = 0;
+                while let Some(ev) = next.take() {
+                    match ev {
+                        agentstate_storage::traits::WatchEvent::Put(o) => {
+                            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
+                            let lag = (chrono::Utc::now() - o.ts).num_milliseconds() as f64 / 1000.0;
+                            metrics::WATCH_EMIT_LAG_SEC.observe(lag.max(0.0));
+                            let payload = serde_json::to_string(&json!({"type":"put","obj":o,"commit_seq":o.commit_seq})).unwrap();
+                            chunk.push_str(&format!("id: {}\ndata: {}\n\n", o.commit_seq, payload));
+                        }
+                        agentstate_storage::traits::WatchEvent::Delete{ns,id,commit_seq} => {
+                            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
+                            let payload = serde_json::to_string(&json!({"type":"delete","ns":ns,"id":id,"commit_seq":commit_seq})).unwrap();
+                            chunk.push_str(&format!("id: {}\ndata: {}\n\n", commit_seq, payload));
+                        }
                     }
-                    agentstate_storage::traits::WatchEvent::Delete{ns,id,commit_seq} => {
-                        WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
-                        let payload = serde_json::to_string(&json!({"type":"delete","ns":ns,"id":id,"commit_seq":commit_seq})).unwrap();
-                        let chunk = format!("id: {}\ndata: {}\n\n", commit_seq, payload);
-                        yield Ok::<Bytes, std::io::Error>(Bytes::from(chunk));
+                    n += 1;
+                    if n < WATCH_BATCH_MAX && handle.overflow_meta().is_none() {
+                        next = handle.try_next();
                     }
                 }
+                yield Ok::<Bytes, std::io::Error>(Bytes::from(chunk));
             } else {
                 tokio::time::sleep(std::time::Duration::from_millis(100)).await;
             }
@@ -842,6 +1354,10 @@ struct AgentStateGrpc {
 }
 
 type WatchStream = Pin<Box<dyn Stream<Item = Result<agentstate_v1::WatchEvent, Status>> + Send>>;
+type WatchBatchStream =
+    Pin<Box<dyn Stream<Item = Result<agentstate_v1::WatchEventBatch, Status>> + Send>>;
+// Upper bound on events per WatchBatch message
+const WATCH_BATCH_MAX: usize = 100;
 
 #[tonic::async_trait]
 impl agentstate_v1::agent_state_server::AgentState for AgentStateGrpc {
@@ -914,6 +1430,7 @@ impl agentstate_v1::agent_state_server::AgentState for AgentStateGrpc {
                     equals: std::collections::BTreeMap::from([("$".to_string(), serde_json::Value::String(req.jsonpath))]),
                 })
             },
+            r#type: None,
             vector: None,
             limit: None,
             fields: None,
@@ -963,18 +1480,7 @@ impl agentstate_v1::agent_state_server::AgentState for AgentStateGrpc {
                     metrics::WATCH_DROPS_TOTAL.with_label_values(&["overflow"]).inc();
                     Err(Status::resource_exhausted(format!("overflow last_commit={} retry_after_ms={}", last, retry)))?;
                 } else if let Some(ev) = handle.try_next() {
-                    match ev {
-                        agentstate_storage::traits::WatchEvent::Put(o) => {
-                            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
-                            let lag = (chrono::Utc::now() - o.ts).num_milliseconds() as f64 / 1000.0;
-                            metrics::WATCH_EMIT_LAG_SEC.observe(lag.max(0.0));
-                            yield agentstate_v1::WatchEvent { r#type: "put".into(), obj: Some(to_proto_object(o.clone())), id: o.id.clone(), commit: o.commit_seq };
-                        }
-                        agentstate_storage::traits::WatchEvent::Delete{ns:_, id, commit_seq} => {
-                            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
-                            yield agentstate_v1::WatchEvent { r#type: "delete".into(), obj: None, id, commit: commit_seq };
-                        }
-                    }
+                    yield to_proto_event(ev);
                 } else {
                     tokio::time::sleep(std::time::Duration::from_millis(100)).await;
                 }
@@ -982,6 +1488,74 @@ impl agentstate_v1::agent_state_server::AgentState for AgentStateGrpc {
         };
         Ok(TonicResponse::new(Box::pin(output) as WatchStream))
     }
+
+    type WatchBatchStream = WatchBatchStream;
+    async fn watch_batch(
+        &self,
+        request: Request<agentstate_v1::WatchRequest>,
+    ) -> Result<TonicResponse<Self::WatchBatchStream>, Status> {
+        let req = request.into_inner();
+        let mut handle = self.state.store.subscribe(
+            agentstate_storage::traits::WatchFilter { ns: req.ns.clone() },
+            Some(req.from_commit),
+        );
+        if req.from_commit > 0 {
+            WATCH_RESUMES_TOTAL.with_label_values(&["grpc"]).inc();
+        }
+        WATCH_CLIENTS.with_label_values(&["grpc"]).inc();
+        let output = async_stream::try_stream! {
+            loop {
+                if let Some((last, retry)) = handle.overflow_meta() {
+                    metrics::WATCH_DROPS_TOTAL.with_label_values(&["overflow"]).inc();
+                    Err(Status::resource_exhausted(format!("overflow last_commit={} retry_after_ms={}", last, retry)))?;
+                }
+                // Everything already buffered goes out in one message
+                let mut events = Vec::new();
+                while events.len() < WATCH_BATCH_MAX && handle.overflow_meta().is_none() {
+                    match handle.try_next() {
+                        Some(ev) => events.push(to_proto_event(ev)),
+                        None => break,
+                    }
+                }
+                if events.is_empty() {
+                    tokio::time::sleep(std::time::Duration::from_millis(100)).await;
+                } else {
+                    yield agentstate_v1::WatchEventBatch { events };
+                }
+            }
+        };
+        Ok(TonicResponse::new(Box::pin(output) as WatchBatchStream))
+    }
+}
+
+fn to_proto_event(ev: agentstate_storage::traits::WatchEvent) -> agentstate_v1::WatchEvent {
+    match ev {
+        agentstate_storage::traits::WatchEvent::Put(o) => {
+            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
+            let lag = (chrono::Utc::now() - o.ts).num_milliseconds() as f64 / 1000.0;
+            metrics::WATCH_EMIT_LAG_SEC.observe(lag.max(0.0));
+            let (id, commit) = (o.id.clone(), o.commit_seq);
+            agentstate_v1::WatchEvent {
+                r#type: "put".into(),
+                obj: Some(to_proto_object(o)),
+                id,
+                commit,
+            }
+        }
+        agentstate_storage::traits::WatchEvent::Delete {
+            ns: _,
+            id,
+            commit_seq,
+        } => {
+            WATCH_EVENTS_TOTAL.with_label_values(&["put"]).inc();
+            agentstate_v1::WatchEvent {
+                r#type: "delete".into(),
+                obj: None,
+                id,
+                commit: commit_seq,
+            }
+        }
+    }
 }
 
 fn to_proto_object(o: agentstate_core::Object) -> agentstate_v1::Object {
@@ -999,6 +1573,55 @@ fn to_proto_object(o: agentstate_core::Object) -> agentstate_v1::Object {
 }
 
 // Capability token enforcement (simple HMAC signed JSON)
+// Per-write claim limits: region pin and max_bytes (size of the object being written)
+fn check_write_claims(
+    claims: &serde_json::Value,
+    size: Option<u64>,
+) -> Result<(), (StatusCode, Json<serde_json::Value>)> {
+    if let Some(reg) = claims.get("region").and_then(|v| v.as_str()) {
+        if let Ok(srv) = std::env::var("REGION") {
+            if !srv.is_empty() && srv != reg {
+                return Err((
+                    StatusCode::UNAVAILABLE_FOR_LEGAL_REASONS,
+                    Json(json!({"error":"region_mismatch"})),
+                ));
+            }
+        }
+    }
+    if let (Some(maxb), Some(size)) = (claims.get("max_bytes").and_then(|v| v.as_u64()), size) {
+        if size > maxb {
+            return Err((
+                StatusCode::PAYLOAD_TOO_LARGE,
+                Json(json!({"error":"too_large"})),
+            ));
+        }
+    }
+    Ok(())
+}
+
+// Optional lease fencing: If-Resource requires a current If-Fence token
+async fn check_fence(
+    app: &AppState,
+    ns: &str,
+    headers: &HeaderMap,
+) -> Result<(), (StatusCode, Json<serde_json::Value>)> {
+    if let Some(resource) = headers.get("If-Resource").and_then(|v| v.to_str().ok()) {
+        match headers
+            .get("If-Fence")
+            .and_then(|v| v.to_str().ok())
+            .and_then(|s| s.parse::<u64>().ok())
+        {
+            Some(f) => {
+                if let Err(e) = app.store.validate_fence(ns, resource, f).await {
+                    return Err((StatusCode::CONFLICT, Json(json!({"error": e.to_string()}))));
+                }
+            }
+            None => return Err((StatusCode::CONFLICT, Json(json!({"error":"missing fence"})))),
+        }
+    }
+    Ok(())
+}
+
 fn enforce_caps(
     headers: &HeaderMap,
     ns: &str,
@@ -1095,6 +1718,16 @@ fn enforce_caps(
 fn rate_limit(
     state: &AppState,
     claims: &serde_json::Value,
+) -> Result<(), (StatusCode, Json<serde_json::Value>)> {
+    rate_limit_n(state, claims, 1)
+}
+
+// Charge `cost` tokens at once (e.g. one per object in a batch); all or nothing.
+// A cost above the burst could never be admitted, so it is rejected with 413
+fn rate_limit_n(
+    state: &AppState,
+    claims: &serde_json::Value,
+    cost: u64,
 ) -> Result<(), (StatusCode, Json<serde_json::Value>)> {
     let max_qps = claims
         .get("max_qps")
@@ -1112,12 +1745,18 @@ fn rate_limit(
     let mut map = state.qps.write();
     let now = std::time::Instant::now();
     let (refill_per_s, burst) = (max_qps as f64, (max_qps * 2) as u64);
+    if cost > burst {
+        return Err((
+            StatusCode::PAYLOAD_TOO_LARGE,
+            Json(json!({"error": "batch_exceeds_rate_burst", "max_ops": burst})),
+        ));
+    }
     let entry = map.entry(key).or_insert((burst as f64, now, burst));
     let elapsed = now.duration_since(entry.1).as_secs_f64();
     entry.0 = (entry.0 + elapsed * refill_per_s).min(burst as f64);
     entry.1 = now;
-    if entry.0 >= 1.0 {
-        entry.0 -= 1.0;
+    if entry.0 >= cost as f64 {
+        entry.0 -= cost as f64;
         Ok(())
     } else {
         Err((
@@ -162,12 +162,20 @@ impl InMemoryStore {
         }
         map
     }
-}
 
-#[async_trait::async_trait]
-impl Storage for InMemoryStore {
-    async fn put(&self, ns: &str, req: PutRequest) -> Result<Object> {
-        let mut inner = self.inner.write();
+    // commit_seq of the latest live version of (ns, id), if any
+    fn current_seq(inner: &Inner, ns: &str, id: &str, now: DateTime<Utc>) -> Option<u64> {
+        inner
+            .data
+            .get(&(ns.to_string(), id.to_string()))?
+            .iter()
+            .rev()
+            .find(|v| !Self::is_expired(v, now))
+            .map(|v| v.commit_seq)
+    }
+
+    // Assign the next commit_seq, store, index and fan out; caller holds the write lock
+    fn put_locked(inner: &mut Inner, ns: &str, req: PutRequest) -> Object {
         let next = inner
             .commit_seq
             .entry(ns.to_string())
@@ -211,7 +219,31 @@ impl Storage for InMemoryStore {
                 b.push(WatchEvent::Put(obj.clone()));
             }
         }
-        Ok(obj)
+        obj
+    }
+}
+
+#[async_trait::async_trait]
+impl Storage for InMemoryStore {
+    async fn put(&self, ns: &str, req: PutRequest) -> Result<Object> {
+        let mut inner = self.inner.write();
+        Ok(Self::put_locked(&mut inner, ns, req))
+    }
+
+    async fn put_if(&self, ns: &str, req: PutRequest, expected: Option<u64>) -> Result<Object> {
+        let mut inner = self.inner.write();
+        // Checked under the same write lock as the put, so no writer can slip in between
+        let current = match req.id.as_deref() {
+            Some(id) => Self::current_seq(&inner, ns, id, Utc::now()),
+            None => None,
+        };
+        if current != expected {
+            return Err(StateError::Conflict(format!(
+                "version_mismatch: expected {:?}, current {:?}",
+                expected, current
+            )));
+        }
+        Ok(Self::put_locked(&mut inner, ns, req))
     }
 
     async fn get(&self, ns: &str, id: &str, opts: crate::traits::GetOptions) -> Result<Object> {
@@ -273,13 +305,14 @@ impl Storage for InMemoryStore {
             }
         }
         // Scan candidates or full ns
+        let type_ok = |o: &Object| req.r#type.as_deref().map_or(true, |t| o.r#type == t);
         let mut out = Vec::new();
         match candidate_ids {
             Some(ids) => {
                 for (id, _) in ids.into_iter() {
                     if let Some(versions) = inner.data.get(&(ns.to_string(), id.clone())) {
                         if let Some(v) = versions.last() {
-                            if !Self::is_expired(v, now) {
+                            if !Self::is_expired(v, now) && type_ok(v) {
                                 out.push(v.clone());
                             }
                         }
@@ -292,7 +325,7 @@ impl Storage for InMemoryStore {
                         continue;
                     }
                     if let Some(v) = versions.last() {
-                        if !Self::is_expired(v, now) {
+                        if !Self::is_expired(v, now) && type_ok(v) {
                             out.push(v.clone());
                         }
                     }
@@ -363,6 +396,10 @@ impl Storage for InMemoryStore {
         }
     }
 
+    fn head_commit(&self, ns: &str) -> u64 {
+        self.inner.read().commit_seq.get(ns).copied().unwrap_or(0)
+    }
+
     fn subscribe(
         &self,
         filter: WatchFilter,
@@ -82,12 +82,9 @@ impl PersistentStore {
         std::fs::rename(tmp, manpath)?;
         Ok(m.current_snapshot.clone().unwrap())
     }
-}
 
-#[async_trait::async_trait]
-impl Storage for PersistentStore {
-    async fn put(&self, ns: &str, req: PutRequest) -> Result<Object> {
-        let o = self.mem.put(ns, req).await?;
+    // Append an applied put to the WAL and advance the manifest watermark
+    async fn log_put(&self, o: Object) -> Result<Object> {
         {
             let wal = self.wal.lock().await;
             let body = RecBody::Put {
@@ -98,9 +95,85 @@ impl Storage for PersistentStore {
                 .await
                 .map_err(|e| StateError::Internal(e.to_string()))?;
         }
-        self.manifest.write().last_seq = self.manifest.read().last_seq.max(o.commit_seq);
+        {
+            let mut m = self.manifest.write();
+            m.last_seq = m.last_seq.max(o.commit_seq);
+        }
         Ok(o)
     }
+}
+
+#[async_trait::async_trait]
+impl Storage for PersistentStore {
+    async fn put(&self, ns: &str, req: PutRequest) -> Result<Object> {
+        let o = self.mem.put(ns, req).await?;
+        self.log_put(o).await
+    }
+
+    async fn put_if(&self, ns: &str, req: PutRequest, expected: Option<u64>) -> Result<Object> {
+        // The in-memory engine checks and applies atomically; only applied writes are logged
+        let o = self.mem.put_if(ns, req, expected).await?;
+        self.log_put(o).await
+    }
+
+    async fn put_many(&self, ns: &str, reqs: Vec<PutRequest>) -> Result<Vec<Object>> {
+        let mut objs = Vec::with_capacity(reqs.len());
+        for req in reqs {
+            objs.push(self.mem.put(ns, req).await?);
+        }
+        let bodies: Vec<(u64, RecBody)> = objs
+            .iter()
+            .map(|o| {
+                (
+                    o.commit_seq,
+                    RecBody::Put {
+                        ns: o.ns.clone(),
+                        obj: serde_json::to_value(o).unwrap(),
+                    },
+                )
+            })
+            .collect();
+        {
+            let wal = self.wal.lock().await;
+            wal.append_many(Utc::now().timestamp(), &bodies)
+                .await
+                .map_err(|e| StateError::Internal(e.to_string()))?;
+        }
+        if let Some(max_seq) = objs.iter().map(|o| o.commit_seq).max() {
+            let mut m = self.manifest.write();
+            m.last_seq = m.last_seq.max(max_seq);
+        }
+        Ok(objs)
+    }
+
+    async fn delete_many(&self, ns: &str, ids: &[String]) -> Result<Vec<String>> {
+        let now = Utc::now().timestamp();
+        let mut deleted = Vec::with_capacity(ids.len());
+        for id in ids {
+            match self.mem.delete(ns, id).await {
+                Ok(()) => deleted.push(id.clone()),
+                Err(StateError::NotFound) => {}
+                Err(e) => return Err(e),
+            }
+        }
+        let bodies: Vec<(u64, RecBody)> = deleted
+            .iter()
+            .map(|id| {
+                (
+                    0,
+                    RecBody::Delete {
+                        ns: ns.to_string(),
+                        id: id.clone(),
+                    },
+                )
+            })
+            .collect();
+        let wal = self.wal.lock().await;
+        wal.append_many(now, &bodies)
+            .await
+            .map_err(|e| StateError::Internal(e.to_string()))?;
+        Ok(deleted)
+    }
 
     async fn get(&self, ns: &str, id: &str, opts: crate::traits::GetOptions) -> Result<Object> {
         self.mem.get(ns, id, opts).await
@@ -130,6 +203,10 @@ impl Storage for PersistentStore {
         self.mem.subscribe(filter, from_commit)
     }
 
+    fn head_commit(&self, ns: &str) -> u64 {
+        self.mem.head_commit(ns)
+    }
+
     async fn sweep_expired(&self, retention_secs: u64) -> Result<u64> {
         self.mem.sweep_expired(retention_secs).await
     }
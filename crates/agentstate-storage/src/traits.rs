@@ -28,11 +28,56 @@ pub trait Storage: Send + Sync + 'static {
     async fn get(&self, ns: &str, id: &str, opts: GetOptions) -> Result<Object>;
     async fn query(&self, ns: &str, req: QueryRequest) -> Result<Vec<Object>>;
     async fn delete(&self, ns: &str, id: &str) -> Result<()>;
+
+    // Compare-and-put: write only if the object's current commit_seq equals `expected`
+    // (None: the object must not exist), else Conflict. Engines override this to make
+    // the check atomic with the write; the default is only a best-effort get-then-put.
+    async fn put_if(&self, ns: &str, req: PutRequest, expected: Option<u64>) -> Result<Object> {
+        let current = match req.id.as_deref() {
+            Some(id) => self
+                .get(ns, id, GetOptions { at_ts: None })
+                .await
+                .ok()
+                .map(|o| o.commit_seq),
+            None => None,
+        };
+        if current != expected {
+            return Err(agentstate_core::StateError::Conflict(format!(
+                "version_mismatch: expected {:?}, current {:?}",
+                expected, current
+            )));
+        }
+        self.put(ns, req).await
+    }
+
+    // Batch writes: engines may override to amortize durability cost across the batch
+    async fn put_many(&self, ns: &str, reqs: Vec<PutRequest>) -> Result<Vec<Object>> {
+        let mut out = Vec::with_capacity(reqs.len());
+        for req in reqs {
+            out.push(self.put(ns, req).await?);
+        }
+        Ok(out)
+    }
+    // Returns the ids that existed and were deleted; missing ids are skipped
+    async fn delete_many(&self, ns: &str, ids: &[String]) -> Result<Vec<String>> {
+        let mut out = Vec::with_capacity(ids.len());
+        for id in ids {
+            match self.delete(ns, id).await {
+                Ok(()) => out.push(id.clone()),
+                Err(agentstate_core::StateError::NotFound) => {}
+                Err(e) => return Err(e),
+            }
+        }
+        Ok(out)
+    }
     async fn sweep_expired(&self, retention_secs: u64) -> Result<u64>; // returns removed count
 
     // Subscribe from an optional resume token (commit_seq)
     fn subscribe(&self, filter: WatchFilter, from_commit: Option<u64>) -> Box<dyn WatchHandle>;
 
+    // Latest commit_seq issued in a namespace (0 if none); any write advances it
+    fn head_commit(&self, ns: &str) -> u64;
+
     // Leases
     async fn lease_acquire(&self, ns: &str, key: &str, owner: &str, ttl_secs: u64)
         -> Result<Lease>;
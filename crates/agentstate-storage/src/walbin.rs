@@ -215,6 +215,46 @@ impl WalWriter {
     }
 
     pub async fn append(&self, seq: u64, ts: i64, body: &RecBody) -> std::io::Result<()> {
+        let (rec, size) = Self::encode(seq, ts, body);
+        let (tx, rx) = oneshot::channel();
+        let _ = self
+            .tx
+            .send(Enq {
+                rec,
+                size,
+                seq,
+                ack: tx,
+            })
+            .await;
+        let _ = rx.await; // wait fsync
+        Ok(())
+    }
+
+    // Enqueue all records before waiting so the fsync worker can group them
+    // into as few fsyncs as its batch window allows.
+    pub async fn append_many(&self, ts: i64, bodies: &[(u64, RecBody)]) -> std::io::Result<()> {
+        let mut acks = Vec::with_capacity(bodies.len());
+        for (seq, body) in bodies {
+            let (rec, size) = Self::encode(*seq, ts, body);
+            let (tx, rx) = oneshot::channel();
+            let _ = self
+                .tx
+                .send(Enq {
+                    rec,
+                    size,
+                    seq: *seq,
+                    ack: tx,
+                })
+                .await;
+            acks.push(rx);
+        }
+        for rx in acks {
+            let _ = rx.await; // wait fsync
+        }
+        Ok(())
+    }
+
+    fn encode(seq: u64, ts: i64, body: &RecBody) -> (Vec<u8>, usize) {
         let mut v = Vec::new();
         ser::into_writer(body, &mut v).unwrap();
         let len = v.len() as u32;
@@ -232,18 +272,7 @@ impl WalWriter {
         rec.extend_from_slice(&(crc.to_be_bytes()));
         WAL_RECORDS_TOTAL.inc();
         WAL_BYTES_TOTAL.inc_by(rec.len() as u64);
-        let (tx, rx) = oneshot::channel();
-        let _ = self
-            .tx
-            .send(Enq {
-                rec,
-                size: len as usize,
-                seq,
-                ack: tx,
-            })
-            .await;
-        let _ = rx.await; // wait fsync
-        Ok(())
+        (rec, len as usize)
     }
 
     fn rectype(b: &RecBody) -> RecType {
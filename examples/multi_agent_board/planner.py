@@ -1,13 +1,18 @@
-from sdk-py.agentstate.client import State
-import time, uuid
+from agentstate import State
+import os, secrets, time
+
+# Seconds between planned tasks; DEMO_PACE=0 plans them back to back
+PACE = float(os.environ.get("DEMO_PACE", "0.5"))
 
 def main():
-    s = State("http://localhost:8080/v1/acme")
+    # One client for the whole loop: its session keeps the connection alive between puts
+    s = State("http://localhost:8080", "acme")
     for i in range(10):
-        tid = str(uuid.uuid4())
+        tid = secrets.token_hex(8)
         obj = s.put("task", {"id": tid, "text": f"Task {i}"}, tags={"topic":"board","status":"open"}, idempotency_key=f"task-{tid}")
         print("planned", obj.get("id"))
-        time.sleep(0.5)
+        if PACE:
+            time.sleep(PACE)
 
 if __name__ == '__main__':
     main()
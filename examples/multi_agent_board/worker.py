@@ -1,25 +1,38 @@
-import argparse, time
-from sdk-py.agentstate.client import State
+import argparse, os, time
+import requests
+from agentstate import State
+
+# Seconds of simulated work per task; WORK_SIM=0 measures the board itself
+WORK_SIM = float(os.environ.get("WORK_SIM", "1"))
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--owner', required=True)
     args = ap.parse_args()
-    s = State("http://localhost:8080/v1/acme")
+    s = State("http://localhost:8080", "acme")
     while True:
-        tasks = s.query(tag_filter={"topic":"board","status":"open"}, limit=1)
+        # One query per sweep; work through every open task it returned
+        tasks = s.query(tag_filter={"topic":"board","status":"open"})
         if not tasks:
             time.sleep(1)
             continue
-        t = tasks[0]
-        tid = t["id"]
-        lease = s.lease_acquire(tid, args.owner, 15)
-        print("lease", tid, lease)
-        # simulate work
-        time.sleep(1)
-        s.put("result", {"task": tid, "owner": args.owner, "ok": True}, tags={"topic":"board","status":"done"}, idempotency_key=f"res-{tid}")
-        s.lease_release(tid, args.owner, lease["token"])
+        for t in tasks:
+            tid = t["id"]
+            try:
+                lease = s.lease_acquire(tid, args.owner, 15)
+            except requests.HTTPError:
+                continue  # another worker holds it
+            print("lease", tid, lease)
+            if WORK_SIM:
+                time.sleep(WORK_SIM)  # simulate work
+            # Result and task status in one batch request
+            s.create_agents_bulk([
+                {"agent_type": "result", "body": {"task": tid, "owner": args.owner, "ok": True},
+                 "tags": {"topic":"board","status":"done"}, "agent_id": f"res-{tid}"},
+                {"agent_type": t["type"], "body": t["body"],
+                 "tags": {**t["tags"], "status": "done"}, "agent_id": tid},
+            ])
+            s.lease_release(tid, args.owner, lease["token"])
 
 if __name__ == '__main__':
     main()
-
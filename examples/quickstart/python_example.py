@@ -9,27 +9,31 @@ This example demonstrates how to use AgentState as "Firebase for AI Agents"
 - Subscribe to real-time updates
 - Manage agent lifecycle
 
-Install: pip install agentstate
+Install: pip install agentstate[async]
 Usage: python python_example.py
 """
 
-import time
-from datetime import datetime
-from agentstate import AgentStateClient
+import asyncio
+import os
+from agentstate import AsyncAgentStateClient
 
-def main():
+# Seconds of simulated work between updates; DEMO_PACE=0 runs the demo flat out
+PACE = float(os.environ.get("DEMO_PACE", "1"))
+
+async def main():
     """Example usage demonstrating AgentState as Firebase for AI Agents"""
     
     print("🤖 AgentState Python Example")
     print("============================")
     
-    # Initialize client  
-    client = AgentStateClient(base_url="http://localhost:8080", namespace="my-ai-app")
+    # Initialize client (one pooled connection set shared by concurrent calls)
+    client = AsyncAgentStateClient(base_url="http://localhost:8080", namespace="my-ai-app",
+                                   max_connections=100)
     
     try:
-        # 1. Create a chatbot agent
-        print("\n📝 Creating chatbot agent...")
-        chatbot = client.create_agent(
+        # 1 + 2. Create a chatbot and a data processing agent concurrently
+        print("\n📝 Creating chatbot and data processor agents...")
+        chatbot, processor = await asyncio.gather(client.create_agent(
             agent_type="chatbot",
             body={
                 "name": "CustomerSupportBot",
@@ -47,13 +51,7 @@ def main():
                 "team": "customer-support",
                 "version": "1.2.0"
             }
-        )
-        chatbot_id = chatbot["id"]
-        print(f"✅ Created chatbot: {chatbot_id}")
-        
-        # 2. Create a data processing agent
-        print("\n📊 Creating data processor agent...")
-        processor = client.create_agent(
+        ), client.create_agent(
             agent_type="processor",
             body={
                 "name": "DataPipelineProcessor",
@@ -67,13 +65,15 @@ def main():
                 "team": "data",
                 "capability": "batch-processing"
             }
-        )
+        ))
+        chatbot_id = chatbot["id"]
         processor_id = processor["id"]
+        print(f"✅ Created chatbot: {chatbot_id}")
         print(f"✅ Created processor: {processor_id}")
         
         # 3. Update chatbot state (simulate handling a conversation)
         print("\n💬 Updating chatbot state (simulating conversation)...")
-        updated_chatbot = client.create_agent(
+        updated_chatbot = await client.create_agent(
             agent_type="chatbot",
             agent_id=chatbot_id,  # Update existing agent
             body={
@@ -95,54 +95,52 @@ def main():
         )
         print("✅ Updated chatbot state")
         
-        # 4. Query all production agents
-        print("\n🔍 Querying all production agents...")
-        production_agents = client.query_agents(tags={"environment": "production"})
+        # 4 + 5. Query production agents and chatbot agents concurrently
+        print("\n🔍 Querying production agents and chatbot agents...")
+        production_agents, chatbots = await asyncio.gather(
+            client.query_agents(tags={"environment": "production"}),
+            client.query_agents(agent_type="chatbot")
+        )
         print(f"✅ Found {len(production_agents)} production agents:")
         for agent in production_agents:
             print(f"  - {agent['body']['name']} ({agent['type']}) - {agent['body']['status']}")
         
-        # 5. Query specific agent types
-        print("\n🤖 Querying chatbot agents...")
-        all_agents = client.query_agents()
-        chatbots = [a for a in all_agents if a.get("type") == "chatbot"]
         print(f"✅ Found {len(chatbots)} chatbot agents")
         
         # 6. Demonstrate real-time state management
         print("\n⚡ Demonstrating real-time state updates...")
+        # Built once; each update only changes the per-job fields
+        processor_body = {
+            "name": "DataPipelineProcessor",
+            "status": "processing",
+            "current_job": None,
+            "queue_size": 0,
+            "processed_today": 0
+        }
+        processor_tags = processor["tags"]
         for i in range(3):
-            # Update processor with new job
-            client.create_agent(
+            processor_body["current_job"] = f"job_{i+1}"
+            processor_body["queue_size"] = 5 - i
+            processor_body["processed_today"] = i + 1
+            # Update processor with new job; the response is the stored state
+            current_state = await client.create_agent(
                 agent_type="processor",
                 agent_id=processor_id,
-                body={
-                    "name": "DataPipelineProcessor",
-                    "status": "processing",
-                    "current_job": f"job_{i+1}",
-                    "queue_size": 5 - i,
-                    "processed_today": i + 1
-                },
-                tags={
-                    "environment": "production",
-                    "team": "data",
-                    "capability": "batch-processing"
-                }
+                body=processor_body,
+                tags=processor_tags
             )
-            
-            # Get current state
-            current_state = client.get_agent(processor_id)
             job = current_state["body"]["current_job"]
             queue = current_state["body"]["queue_size"]
             print(f"  Processing {job}, queue size: {queue}")
             
-            time.sleep(1)  # Simulate processing time
+            if PACE:
+                await asyncio.sleep(PACE)  # Simulate processing time
         
         print("✅ Real-time updates complete")
         
         # 7. Clean up (optional)
         print("\n🧹 Cleaning up test agents...")
-        client.delete_agent(chatbot_id)
-        client.delete_agent(processor_id)
+        await asyncio.gather(client.delete_agent(chatbot_id), client.delete_agent(processor_id))
         print("✅ Cleanup complete")
         
         print(f"\n🎉 Example complete! AgentState makes it easy to:")
@@ -155,6 +153,8 @@ def main():
     except Exception as e:
         print(f"❌ Error: {e}")
         print("Make sure AgentState server is running on http://localhost:8080")
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -1,28 +1,83 @@
-import asyncio, os, random
+import asyncio, math, os, random, threading
 from agentstate import State
 
+BATCH = 256
+
 async def writer(state: State):
   i = 0
   while True:
-    state.put("evt", {"i": i, "text": "x"*256}, tags={"t":"soak"})
-    i += 1
-    await asyncio.sleep(0)
+    # One batch request per loop trip; runs off-loop so watchers keep draining
+    batch = [{"agent_type": "evt", "body": {"i": i + n, "text": "x"*256}, "tags": {"t":"soak"}}
+             for n in range(BATCH)]
+    await asyncio.to_thread(state.create_agents_bulk, batch)
+    i += BATCH
+
+class BroadcastWatcher:
+  """One server watch stream fanned out to in-process subscriber queues.
+
+  Each subscriber gets a bounded queue; a subscriber that falls behind has
+  its queue reset and its on_gap called, like the server does on overflow.
+  """
+
+  def __init__(self, state: State, maxsize: int, **watch_kwargs):
+    self.state = state
+    self.maxsize = maxsize
+    self.watch_kwargs = watch_kwargs
+    self.subscribers = []
+
+  def subscribe(self, on_gap=None) -> asyncio.Queue:
+    q = asyncio.Queue(maxsize=self.maxsize)
+    self.subscribers.append((q, on_gap))
+    return q
+
+  def _publish(self, ev):
+    for q, on_gap in self.subscribers:
+      try:
+        q.put_nowait(ev)
+      except asyncio.QueueFull:
+        while not q.empty():
+          q.get_nowait()
+        if on_gap:
+          on_gap(ev.get("commit_seq"))
 
-async def watcher(state: State, idx: int):
+  def start(self):
+    # SDK watch is a blocking SSE iterator; pump it from a thread into the loop
+    loop = asyncio.get_running_loop()
+    def pump():
+      for ev in self.state.watch(**self.watch_kwargs):
+        loop.call_soon_threadsafe(self._publish, ev)
+    threading.Thread(target=pump, daemon=True).start()
+
+HICCUP_P = 0.0005
+_LOG_MISS = math.log1p(-HICCUP_P)
+
+def events_until_hiccup() -> int:
+  # Geometric(HICCUP_P) draw: same hiccup rate as a per-event coin flip, one PRNG call per hiccup
+  return int(math.log(1.0 - random.random()) / _LOG_MISS) + 1
+
+async def watcher(q: asyncio.Queue, idx: int):
   last = 0
-  async for ev in state.watch(filter={"tags":{"t":"soak"}}, from_commit=None, on_gap=lambda c: print(f"[w{idx}] gap at {c}")):
+  until_hiccup = events_until_hiccup()
+  while True:
+    ev = await q.get()
     cs = int(ev.get("commit_seq") or ev.get("commit") or 0)
     if cs <= last:
       raise RuntimeError("non-monotonic stream")
     last = cs
-    if random.random() < 0.0005:
+    until_hiccup -= 1
+    if not until_hiccup:
       await asyncio.sleep(0.5)
+      until_hiccup = events_until_hiccup()
 
 async def main():
   os.environ.setdefault("WATCH_BUFFER_EVENTS", "100")
-  s = State("http://localhost:8080/v1/soak")
-  await asyncio.gather(writer(s), *(watcher(s, i) for i in range(10)))
+  s = State("http://localhost:8080", "soak")
+  # One server subscription shared by all watchers instead of 10 server-side fan-outs
+  bcast = BroadcastWatcher(s, int(os.environ["WATCH_BUFFER_EVENTS"]), filter={"tags":{"t":"soak"}},
+                           on_gap=lambda c: print(f"[bcast] gap at {c}"))
+  queues = [bcast.subscribe(on_gap=lambda c, i=i: print(f"[w{i}] gap at {c}")) for i in range(10)]
+  bcast.start()
+  await asyncio.gather(writer(s), *(watcher(q, i) for i, q in enumerate(queues)))
 
 if __name__ == '__main__':
   asyncio.run(main())
-
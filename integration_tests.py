@@ -8,9 +8,11 @@ Tests all features: CRUD, querying, real-time updates, persistence, etc.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import threading
+import socket
 import subprocess
 import sys
 from datetime import datetime
@@ -18,11 +20,57 @@ from typing import Dict, Any, List
 import asyncio
 import concurrent.futures
 
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _dumps = lambda obj: json.dumps(obj, separators=(",", ":")).encode()
+    _loads = json.loads
+
+class NoNagleAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets skip Nagle and get a larger send buffer.
+
+    socket_options replaces urllib3's defaults, so TCP_NODELAY is listed
+    explicitly alongside keepalive and a 256KB SO_SNDBUF for burst sends.
+    """
+
+    socket_options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        (socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        return super().init_poolmanager(*args, **kwargs)
+
 class AgentStateTestClient:
-    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "integration-tests"):
+    _json_headers = {"Content-Type": "application/json"}
+
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "integration-tests",
+                 pool_maxsize: int = 4):
         self.base_url = base_url.rstrip('/')
         self.namespace = namespace
-        self.session = requests.Session()
+        self._objects_url = f"{self.base_url}/v1/{self.namespace}/objects"
+        self._obj_fmt = self._objects_url + "/%s"
+        self._query_url = f"{self.base_url}/v1/{self.namespace}/query"
+        # Sessions are per thread (see `session`), so each worker keeps its own
+        # keep-alive connection without contending on a shared pool lock
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """This thread's Session; worker threads never share a connection pool"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            adapter = NoNagleAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
     
     def create_agent(self, agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None, agent_id: str = None) -> Dict[str, Any]:
         payload = {
@@ -34,17 +82,17 @@ class AgentStateTestClient:
             payload["id"] = agent_id
         
         response = self.session.post(
-            f"{self.base_url}/v1/{self.namespace}/objects",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            self._objects_url,
+            data=_dumps(payload),
+            headers=self._json_headers
         )
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def get_agent(self, agent_id: str) -> Dict[str, Any]:
-        response = self.session.get(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
+        response = self.session.get(self._obj_fmt % agent_id)
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def query_agents(self, tags: Dict[str, str] = None) -> List[Dict[str, Any]]:
         query = {}
@@ -52,17 +100,28 @@ class AgentStateTestClient:
             query["tags"] = tags
         
         response = self.session.post(
-            f"{self.base_url}/v1/{self.namespace}/query",
-            json=query,
-            headers={"Content-Type": "application/json"}
+            self._query_url,
+            data=_dumps(query),
+            headers=self._json_headers
         )
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def delete_agent(self, agent_id: str) -> None:
-        response = self.session.delete(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
+        response = self.session.delete(self._obj_fmt % agent_id)
         response.raise_for_status()
     
+    def delete_agents(self, agent_ids: List[str], workers: int = 8) -> None:
+        """Delete independent agents concurrently, one strided chunk per worker"""
+        workers = max(1, min(workers, len(agent_ids)))
+        
+        def delete_chunk(ids: List[str]):
+            for agent_id in ids:
+                self.delete_agent(agent_id)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(delete_chunk, (agent_ids[w::workers] for w in range(workers))))
+    
     def health_check(self) -> bool:
         try:
             response = self.session.get(f"{self.base_url}/health")
@@ -133,11 +192,12 @@ class IntegrationTests:
         """Test tag-based querying"""
         # Create agents with different tags
         agents = []
+        team_tags = [{"environment": "test", "team": f"team{t}"} for t in range(2)]
         for i in range(5):
             agent = self.client.create_agent(
                 "tagged-agent",
                 {"name": f"Agent{i}", "batch": "test"},
-                {"environment": "test", "team": f"team{i % 2}"}
+                team_tags[i % 2]
             )
             agents.append(agent["id"])
         
@@ -152,16 +212,16 @@ class IntegrationTests:
         assert len(team1_agents) >= 3, f"Expected at least 3 team1 agents, got {len(team1_agents)}"
         
         # Cleanup
-        for agent_id in agents:
-            self.client.delete_agent(agent_id)
+        self.client.delete_agents(agents)
     
     def test_real_time_updates(self):
         """Test real-time state updates"""
         # Create agent
+        tags = {"test": "realtime"}
         agent = self.client.create_agent(
             "realtime-agent",
             {"status": "idle", "counter": 0},
-            {"test": "realtime"}
+            tags
         )
         agent_id = agent["id"]
         
@@ -170,7 +230,7 @@ class IntegrationTests:
             updated = self.client.create_agent(
                 "realtime-agent",
                 {"status": "processing", "counter": i + 1},
-                {"test": "realtime"},
+                tags,
                 agent_id
             )
             assert updated["body"]["counter"] == i + 1
@@ -184,41 +244,41 @@ class IntegrationTests:
     
     def test_concurrent_operations(self):
         """Test concurrent access and operations"""
-        def create_agent_worker(worker_id: int) -> str:
-            agent = self.client.create_agent(
-                "concurrent-agent",
-                {"worker": worker_id, "status": "active"},
-                {"test": "concurrency", "worker": str(worker_id)}
-            )
-            return agent["id"]
+        # One future per worker thread, each handling a strided slice of the
+        # work, rather than one future per operation
+        def create_agent_worker(worker_ids: range) -> List[str]:
+            return [
+                self.client.create_agent(
+                    "concurrent-agent",
+                    {"worker": worker_id, "status": "active"},
+                    {"test": "concurrency", "worker": str(worker_id)}
+                )["id"]
+                for worker_id in worker_ids
+            ]
         
         # Create agents concurrently
         with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(create_agent_worker, i) for i in range(20)]
-            agent_ids = [future.result() for future in futures]
+            chunks = executor.map(create_agent_worker, (range(w, 20, 10) for w in range(10)))
+            agent_ids = [agent_id for chunk in chunks for agent_id in chunk]
         
         # Verify all agents were created
         assert len(agent_ids) == 20
         
         # Query concurrently
-        def query_worker():
-            return self.client.query_agents({"test": "concurrency"})
+        query_tags = {"test": "concurrency"}
+        
+        def query_worker(count: int) -> List[List[Dict[str, Any]]]:
+            return [self.client.query_agents(query_tags) for _ in range(count)]
         
         with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(query_worker) for _ in range(10)]
-            results = [future.result() for future in futures]
+            results = [result for chunk in executor.map(query_worker, [2] * 5) for result in chunk]
         
         # All queries should return the same number of agents
         for result in results:
             assert len(result) >= 20, f"Expected at least 20 agents, got {len(result)}"
         
         # Cleanup concurrently
-        def delete_worker(agent_id: str):
-            self.client.delete_agent(agent_id)
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(delete_worker, agent_id) for agent_id in agent_ids]
-            [future.result() for future in futures]
+        self.client.delete_agents(agent_ids, workers=10)
     
     def test_large_payload_handling(self):
         """Test handling of large payloads"""
@@ -280,8 +340,7 @@ class IntegrationTests:
         assert retrieved3["tags"]["special"] == "key-with-dashes_and_underscores.and.dots"
         
         # Cleanup
-        for agent in [agent1, agent2, agent3]:
-            self.client.delete_agent(agent["id"])
+        self.client.delete_agents([agent1["id"], agent2["id"], agent3["id"]])
     
     def test_metrics_endpoint(self):
         """Test metrics endpoint availability"""
@@ -315,9 +374,16 @@ class IntegrationTests:
         print("=" * 30)
         
         total_tests = len(self.test_results)
-        passed_tests = len([r for r in self.test_results if r["status"] == "PASS"])
-        failed_tests = len([r for r in self.test_results if r["status"] == "FAIL"])
-        total_duration = sum(r["duration"] for r in self.test_results)
+        passed_tests = failed_tests = 0
+        total_duration = 0.0
+        failures = []
+        for r in self.test_results:
+            total_duration += r["duration"]
+            if r["status"] == "PASS":
+                passed_tests += 1
+            elif r["status"] == "FAIL":
+                failed_tests += 1
+                failures.append(r)
         
         print(f"Total Tests: {total_tests}")
         print(f"✅ Passed: {passed_tests}")
@@ -326,9 +392,8 @@ class IntegrationTests:
         
         if failed_tests > 0:
             print("\n❌ Failed Tests:")
-            for result in self.test_results:
-                if result["status"] == "FAIL":
-                    print(f"  - {result['name']}: {result.get('error', 'Unknown error')}")
+            for result in failures:
+                print(f"  - {result['name']}: {result.get('error', 'Unknown error')}")
             return False
         else:
             print("\n🎉 All tests passed! AgentState is ready for production.")
@@ -8,20 +8,146 @@ Tests throughput, latency, and concurrent performance.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import http.client
 import json
 import time
 import threading
+import asyncio
+import argparse
+import socket
 import concurrent.futures
-import statistics
 import sys
+import os
+import re
+import shutil
+import subprocess
+import tempfile
 from typing import List, Dict, Any
 import uuid
+from array import array
+from urllib.parse import urlsplit
+
+# optional: the concurrent query/mixed tests prefer aiohttp, then httpx, and
+# fall back to threads without either
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:  # optional: libuv event loop for the async tests
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _dumps = lambda obj: json.dumps(obj, separators=(",", ":")).encode()
+    _loads = json.loads
+
+NS_PER_MS = 1_000_000
+
+# Filler for concurrent_creates bodies, built once per run
+_PAD = "x" * 100
+
+class NoNagleAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets skip Nagle and get a larger send buffer.
+
+    socket_options replaces urllib3's defaults, so TCP_NODELAY is listed
+    explicitly alongside keepalive and a 256KB SO_SNDBUF for burst sends.
+    """
+
+    socket_options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        (socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        return super().init_poolmanager(*args, **kwargs)
+
+# wrk script for the latency benchmark: one create per request, unique body each time
+WRK_CREATE_SCRIPT = """
+wrk.method = "POST"
+wrk.headers["Content-Type"] = "application/json"
+local counter = 0
+request = function()
+  counter = counter + 1
+  local body = string.format(
+    '{"type":"latency-test","body":{"name":"LatencyAgent-%d","sequence":%d},"tags":{"test":"latency"}}',
+    counter, counter)
+  return wrk.format(nil, nil, nil, body)
+end
+"""
+
+_WRK_PERCENTILE = re.compile(r"^\s*(\d+(?:\.\d+)?)%\s+([\d.]+)(us|ms|s)\s*$", re.M)
+_WRK_REQUESTS = re.compile(r"(\d+) requests in")
+_WRK_AVG = re.compile(r"^\s*Latency\s+([\d.]+)(us|ms|s)\b", re.M)
+_WRK_NON_2XX = re.compile(r"Non-2xx or 3xx responses:\s*(\d+)")
+_WRK_SOCKET_ERRORS = re.compile(r"Socket errors: connect (\d+), read (\d+), write (\d+), timeout (\d+)")
+_WRK_UNIT_MS = {"us": 0.001, "ms": 1.0, "s": 1000.0}
+
+def parse_wrk_output(output: str) -> Dict[str, Any]:
+    """Pull the latency distribution (ms), throughput and error counts out of wrk --latency output"""
+    requests_per_sec = re.search(r"Requests/sec:\s*([\d.]+)", output)
+    requests_total = _WRK_REQUESTS.search(output)
+    avg = _WRK_AVG.search(output)
+    socket_errors = _WRK_SOCKET_ERRORS.search(output)
+    non_2xx = _WRK_NON_2XX.search(output)
+    return {
+        "percentiles": {f"p{p}": float(v) * _WRK_UNIT_MS[u] for p, v, u in _WRK_PERCENTILE.findall(output)},
+        "requests": int(requests_total.group(1)) if requests_total else 0,
+        "avg_ms": float(avg.group(1)) * _WRK_UNIT_MS[avg.group(2)] if avg else 0.0,
+        "requests_per_sec": float(requests_per_sec.group(1)) if requests_per_sec else 0.0,
+        "errors": (int(non_2xx.group(1)) if non_2xx else 0)
+                  + (sum(map(int, socket_errors.groups())) if socket_errors else 0),
+    }
+
+def percentiles(durations, *points: float, presorted: bool = False) -> List[float]:
+    """Nearest-rank percentiles (in ms) of ns durations from a single sort"""
+    ordered = durations if presorted else sorted(durations)
+    last = len(ordered) - 1
+    return [ordered[min(last, int(p * len(ordered)))] / NS_PER_MS for p in points]
+
+def mean_ms(durations) -> float:
+    # Integer ns sum is exact; one division at the end
+    return sum(durations) / len(durations) / NS_PER_MS
 
 class LoadTestClient:
-    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "loadtest"):
+    _json_headers = {"Content-Type": "application/json"}
+
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "loadtest",
+                 pool_maxsize: int = 4):
         self.base_url = base_url.rstrip('/')
         self.namespace = namespace
-        self.session = requests.Session()
+        self._objects_url = f"{self.base_url}/v1/{self.namespace}/objects"
+        self._obj_fmt = self._objects_url + "/%s"
+        self._query_url = f"{self.base_url}/v1/{self.namespace}/query"
+        # Sessions are per thread (see `session`), so each worker keeps its own
+        # keep-alive connection without contending on a shared pool lock
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """This thread's Session; worker threads never share a connection pool"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            adapter = NoNagleAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
     
     def health_check(self) -> bool:
         try:
@@ -30,212 +156,510 @@ class LoadTestClient:
         except:
             return False
     
-    def create_agent(self, agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None) -> Dict[str, Any]:
-        payload = {"type": agent_type, "body": body, "tags": tags or {}}
-        response = self.session.post(f"{self.base_url}/v1/{self.namespace}/objects", json=payload)
+    def post_json(self, url: str, payload: Any) -> Any:
+        """POST a JSON payload by re-sending this thread's prepared request for `url`.
+
+        Header merging, cookie handling and URL parsing happen once per thread
+        and URL; each call only swaps in the new body.
+        """
+        prepared_by_url = getattr(self._local, "prepared", None)
+        if prepared_by_url is None:
+            prepared_by_url = self._local.prepared = {}
+        prepared = prepared_by_url.get(url)
+        if prepared is None:
+            prepared = prepared_by_url[url] = self.session.prepare_request(
+                requests.Request("POST", url, headers=self._json_headers)
+            )
+        body = _dumps(payload)
+        prepared.body = body
+        prepared.headers["Content-Length"] = str(len(body))
+        response = self.session.send(prepared)
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
+    
+    def create_agent(self, agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None) -> Dict[str, Any]:
+        return self.post_json(self._objects_url, {"type": agent_type, "body": body, "tags": tags or {}})
     
     def get_agent(self, agent_id: str) -> Dict[str, Any]:
-        response = self.session.get(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
+        response = self.session.get(self._obj_fmt % agent_id)
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def query_agents(self, tags: Dict[str, str] = None) -> List[Dict[str, Any]]:
-        query = {"tags": tags} if tags else {}
-        response = self.session.post(f"{self.base_url}/v1/{self.namespace}/query", json=query)
-        response.raise_for_status()
-        return response.json()
+        return self.post_json(self._query_url, {"tags": tags} if tags else {})
     
     def delete_agent(self, agent_id: str) -> None:
-        response = self.session.delete(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
+        response = self.session.delete(self._obj_fmt % agent_id)
         response.raise_for_status()
 
-class LoadTester:
+class _FastClient:
+    """Bare http.client connector for the sequential latency benchmark.
+
+    Skips the requests/urllib3 layers (URL parsing, adapter dispatch, header
+    merging) so the measured latency is mostly the server's. Each thread
+    keeps one persistent connection.
+    """
+
+    _hdrs = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "loadtest"):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self._local = threading.local()
+        
+        # The namespace is fixed for the client's lifetime, so the request
+        # functions are specialized once here with their paths bound
+        post_objects = self._make_post(f"/v1/{namespace}/objects")
+        post_query = self._make_post(f"/v1/{namespace}/query")
+
+        def create_agent(agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None) -> Dict[str, Any]:
+            return post_objects({"type": agent_type, "body": body, "tags": tags or {}})
+
+        def query_agents(tags: Dict[str, str] = None) -> List[Dict[str, Any]]:
+            return post_query({"tags": tags} if tags else {})
+
+        self.create_agent = create_agent
+        self.query_agents = query_agents
+
+    def _make_post(self, path: str):
+        """Build a POST function with its path, headers and codecs held as closure locals"""
+        local, host, port, hdrs = self._local, self.host, self.port, self._hdrs
+        dumps, loads = _dumps, _loads
+
+        def post(payload: Dict[str, Any]):
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection(host, port, timeout=10)
+            body = dumps(payload)
+            try:
+                try:
+                    conn.request("POST", path, body=body, headers=hdrs)
+                    resp = conn.getresponse()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # Server closed the idle keep-alive connection; reconnect once
+                    conn.close()
+                    conn.request("POST", path, body=body, headers=hdrs)
+                    resp = conn.getresponse()
+                data = resp.read()
+            except Exception:
+                # A timeout or failure mid-request leaves the connection half-used
+                # (CannotSendRequest on the next call); drop it to reconnect
+                conn.close()
+                local.conn = None
+                raise
+            if resp.status >= 400:
+                raise RuntimeError(f"HTTP {resp.status}: {data[:200]!r}")
+            return loads(data)
+
+        return post
+
+class _BorrowedFile:
+    """Shared response reader that HTTPResponse can 'close' without closing it"""
+
+    def __init__(self, fp):
+        self._fp = fp
+
+    def makefile(self, *args, **kwargs):
+        return self
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+class _PipelinedClient:
+    """HTTP/1.1 pipelining backend for the concurrent query test.
+
+    Each worker writes its whole batch of identical queries to one socket in
+    a single sendall, then parses the responses in order, so a batch costs
+    one send syscall instead of one per request.
+
+    Requests in a batch are all in flight at once, so there is no per-request
+    start time; each query records the gap since the previous response (the
+    first one since the send), i.e. the server's per-response service time.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "loadtest"):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self._query_path = f"/v1/{namespace}/query"
+
+    def query_batch(self, tags: Dict[str, str], count: int, results: "ResultSet") -> None:
+        body = _dumps({"tags": tags} if tags else {})
+        request = (
+            f"POST {self._query_path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode() + body
+        done = 0
+        with socket.create_connection((self.host, self.port), timeout=30) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            rfile = _BorrowedFile(sock.makefile("rb"))
+            last = time.perf_counter_ns()
+            sock.sendall(request * count)
+            for _ in range(count):
+                try:
+                    response = http.client.HTTPResponse(rfile)
+                    response.begin()
+                    data = response.read()
+                    if response.status >= 400:
+                        raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+                    _loads(data)
+                    now = time.perf_counter_ns()
+                    results.record("query", now - last)
+                    last = now
+                    done += 1
+                except Exception as e:
+                    # The rest of the batch is lost with the connection
+                    for _ in range(count - done):
+                        results.record("query", 0, str(e))
+                    break
+
+class ResultSet:
+    """Load test results stored column-wise per operation type.
+
+    Successful durations (ns) go into one array('q') per operation; failures
+    are counted per operation with their error messages kept alongside.
+    Operations timed by an external tool (wrk) only report aggregates, kept
+    in `external` as {"count", "avg_ms", "percentiles"}.
+    """
+
     def __init__(self):
+        self.durations: Dict[str, array] = {}
+        self.failures: Dict[str, int] = {}
+        self.errors: List[str] = []
+        self.external: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, operation: str, duration: int, error: str = None) -> None:
+        if error is None:
+            column = self.durations.get(operation)
+            if column is None:
+                column = self.durations[operation] = array('q')
+            column.append(duration)
+        else:
+            self.failures[operation] = self.failures.get(operation, 0) + 1
+            self.errors.append(error)
+
+    def extend(self, other: "ResultSet") -> None:
+        for operation, column in other.durations.items():
+            if operation in self.durations:
+                self.durations[operation].extend(column)
+            else:
+                self.durations[operation] = array('q', column)
+        for operation, count in other.failures.items():
+            self.failures[operation] = self.failures.get(operation, 0) + count
+        self.errors.extend(other.errors)
+        self.external.update(other.external)
+
+    @property
+    def succeeded(self) -> int:
+        return (sum(len(column) for column in self.durations.values())
+                + sum(stats["count"] for stats in self.external.values()))
+
+    @property
+    def failed(self) -> int:
+        return sum(self.failures.values())
+
+    def __len__(self) -> int:
+        return self.succeeded + self.failed
+
+    def all_durations(self) -> array:
+        merged = array('q')
+        for column in self.durations.values():
+            merged.extend(column)
+        return merged
+
+class TokenBucket:
+    """Async rate limiter shared by the coroutines on one event loop.
+
+    Refills at `rate` tokens per second up to `burst`; take() waits only when
+    the bucket is empty, so the workers as a whole run at `rate` ops/sec.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        # At least one whole token, or rates below 1/sec could never be served
+        self.capacity = max(1.0, burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def take(self, deadline: float = None) -> bool:
+        """Take one token; False if none is available before `deadline`"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait >= deadline:
+                return False
+            await asyncio.sleep(wait)
+
+class LoadTester:
+    def __init__(self, backend: str = "requests", mixed_rate: float = None, latency_tool: str = "auto"):
         self.client = LoadTestClient()
-        self.results = []
+        self.fast_client = _FastClient(self.client.base_url, self.client.namespace)
+        self.backend = backend
+        self.mixed_rate = mixed_rate
+        self.latency_tool = latency_tool
         
-    def measure_operation(self, operation_name: str, operation_func):
-        """Measure the performance of a single operation"""
-        start_time = time.time()
+    def measure_operation(self, results: ResultSet, operation_name: str, operation_func, *args):
+        """Measure the performance of a single operation (duration in ns)"""
+        start_time = time.perf_counter_ns()
         try:
-            result = operation_func()
-            duration = time.time() - start_time
-            return {"operation": operation_name, "duration": duration, "success": True, "result": result}
+            operation_func(*args)
         except Exception as e:
-            duration = time.time() - start_time
-            return {"operation": operation_name, "duration": duration, "success": False, "error": str(e)}
+            results.record(operation_name, time.perf_counter_ns() - start_time, str(e))
+        else:
+            results.record(operation_name, time.perf_counter_ns() - start_time)
     
-    def concurrent_creates(self, num_workers: int, operations_per_worker: int) -> List[Dict]:
+    def concurrent_creates(self, num_workers: int, operations_per_worker: int) -> ResultSet:
         """Test concurrent agent creation"""
         print(f"🚀 Testing concurrent creates: {num_workers} workers × {operations_per_worker} ops")
         
-        results = []
+        results = ResultSet()
+        
+        objects_url = self.client._objects_url
         
         def worker(worker_id: int):
-            worker_results = []
+            worker_results = ResultSet()
+            # One payload per worker; only the per-op fields change between posts
+            body = {"name": "", "worker_id": worker_id, "sequence": 0, "timestamp": 0.0, "data": _PAD}
+            payload = {
+                "type": "load-test-agent",
+                "body": body,
+                "tags": {"worker": str(worker_id), "test": "concurrent-creates"}
+            }
             for i in range(operations_per_worker):
-                result = self.measure_operation(
-                    "create",
-                    lambda: self.client.create_agent(
-                        "load-test-agent",
-                        {
-                            "name": f"LoadAgent-{worker_id}-{i}",
-                            "worker_id": worker_id,
-                            "sequence": i,
-                            "timestamp": time.time(),
-                            "data": "x" * 100  # Some payload
-                        },
-                        {"worker": str(worker_id), "test": "concurrent-creates"}
-                    )
-                )
-                worker_results.append(result)
+                body["name"] = f"LoadAgent-{worker_id}-{i}"
+                body["sequence"] = i
+                body["timestamp"] = time.time()
+                self.measure_operation(worker_results, "create", self.client.post_json, objects_url, payload)
             return worker_results
         
         start_time = time.time()
         with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(worker, i) for i in range(num_workers)]
-            for future in concurrent.futures.as_completed(futures):
-                results.extend(future.result())
+            # One future per worker, collected in order: no per-completion wakeups
+            for worker_results in executor.map(worker, range(num_workers)):
+                results.extend(worker_results)
         
         total_time = time.time() - start_time
-        successful_ops = [r for r in results if r["success"]]
-        failed_ops = [r for r in results if not r["success"]]
         
-        print(f"  ✅ Completed {len(successful_ops)}/{len(results)} operations in {total_time:.2f}s")
-        print(f"  📊 Throughput: {len(successful_ops)/total_time:.2f} ops/sec")
-        if failed_ops:
-            print(f"  ❌ Failed operations: {len(failed_ops)}")
+        print(f"  ✅ Completed {results.succeeded}/{len(results)} operations in {total_time:.2f}s")
+        print(f"  📊 Throughput: {results.succeeded/total_time:.2f} ops/sec")
+        if results.failed:
+            print(f"  ❌ Failed operations: {results.failed}")
         
         return results
     
-    def concurrent_queries(self, num_workers: int, queries_per_worker: int) -> List[Dict]:
+    async def measure_operation_async(self, results: ResultSet, operation_name: str, operation_coro):
+        """Async counterpart of measure_operation; awaits the coroutine"""
+        start_time = time.perf_counter_ns()
+        try:
+            await operation_coro
+        except Exception as e:
+            results.record(operation_name, time.perf_counter_ns() - start_time, str(e))
+        else:
+            results.record(operation_name, time.perf_counter_ns() - start_time)
+
+    async def _post(self, http, url: str, payload: Dict[str, Any]):
+        if http is None:
+            # No async HTTP client installed: run the blocking session call off-loop
+            return await asyncio.to_thread(self.client.post_json, url, payload)
+        if aiohttp is not None and isinstance(http, aiohttp.ClientSession):
+            async with http.post(url, data=_dumps(payload), headers=LoadTestClient._json_headers) as response:
+                response.raise_for_status()
+                return _loads(await response.read())
+        response = await http.post(url, content=_dumps(payload), headers=LoadTestClient._json_headers)
+        response.raise_for_status()
+        return _loads(response.content)
+
+    async def _run_workers(self, num_workers: int, worker) -> None:
+        """Run num_workers coroutines on one event loop sharing one connection pool"""
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=200, limit_per_host=200, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+                await asyncio.gather(*(worker(http, i) for i in range(num_workers)))
+        elif httpx is None:
+            await asyncio.gather(*(worker(None, i) for i in range(num_workers)))
+        else:
+            limits = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+            async with httpx.AsyncClient(limits=limits, timeout=30) as http:
+                await asyncio.gather(*(worker(http, i) for i in range(num_workers)))
+
+    def concurrent_queries(self, num_workers: int, queries_per_worker: int) -> ResultSet:
         """Test concurrent agent queries"""
         print(f"🔍 Testing concurrent queries: {num_workers} workers × {queries_per_worker} queries")
         
-        results = []
+        query_url = self.client._query_url
+        query = {"tags": {"test": "concurrent-creates"}}
+        # Coroutines share one thread, so they can share one result set
+        results = ResultSet()
         
-        def worker(worker_id: int):
-            worker_results = []
+        async def worker(http, worker_id: int):
             for i in range(queries_per_worker):
-                result = self.measure_operation(
-                    "query",
-                    lambda: self.client.query_agents({"test": "concurrent-creates"})
-                )
-                worker_results.append(result)
-            return worker_results
+                await self.measure_operation_async(results, "query", self._post(http, query_url, query))
         
         start_time = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(worker, i) for i in range(num_workers)]
-            for future in concurrent.futures.as_completed(futures):
-                results.extend(future.result())
+        if self.backend == "pipeline":
+            pipelined = _PipelinedClient(self.client.base_url, self.client.namespace)
+            batches = [ResultSet() for _ in range(num_workers)]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+                for _ in executor.map(lambda batch: pipelined.query_batch(query["tags"], queries_per_worker, batch),
+                                      batches):
+                    pass
+            for batch in batches:
+                results.extend(batch)
+        else:
+            asyncio.run(self._run_workers(num_workers, worker))
         
         total_time = time.time() - start_time
-        successful_ops = [r for r in results if r["success"]]
         
-        print(f"  ✅ Completed {len(successful_ops)} queries in {total_time:.2f}s")
-        print(f"  📊 Query throughput: {len(successful_ops)/total_time:.2f} queries/sec")
+        print(f"  ✅ Completed {results.succeeded} queries in {total_time:.2f}s")
+        print(f"  📊 Query throughput: {results.succeeded/total_time:.2f} queries/sec")
+        if self.backend == "pipeline":
+            print("  ℹ️  Pipelined query times are gaps between responses, not round trips")
         
         return results
     
-    def mixed_workload(self, duration_seconds: int, num_workers: int) -> List[Dict]:
-        """Test mixed read/write workload"""
+    def mixed_workload(self, duration_seconds: int, num_workers: int, rate: float = None) -> ResultSet:
+        """Test mixed read/write workload, optionally capped at `rate` ops/sec overall"""
         print(f"🔄 Testing mixed workload: {num_workers} workers for {duration_seconds}s")
         
-        results = []
-        stop_flag = threading.Event()
+        query_url = self.client._query_url
+        objects_url = self.client._objects_url
+        results = ResultSet()
+        bucket = TokenBucket(rate) if rate else None
         
-        def worker(worker_id: int):
-            worker_results = []
+        async def worker(http, worker_id: int):
             operation_count = 0
+            deadline = time.monotonic() + duration_seconds
+            # Payloads are serialized before the next op mutates them
+            query = {"tags": {"worker": str(worker_id % 5)}}
+            body = {"name": "", "timestamp": 0.0}
+            create = {
+                "type": "mixed-workload-agent",
+                "body": body,
+                "tags": {"worker": str(worker_id), "test": "mixed-workload"}
+            }
             
-            while not stop_flag.is_set():
+            while True:
                 operation_count += 1
+                if bucket:
+                    if not await bucket.take(deadline) or time.monotonic() >= deadline:
+                        break
+                # Unthrottled, checking the clock every 8th op is plenty
+                elif operation_count % 8 == 0 and time.monotonic() >= deadline:
+                    break
                 
                 # 70% reads, 30% writes
                 if operation_count % 10 < 7:
                     # Read operation
-                    result = self.measure_operation(
-                        "mixed-query",
-                        lambda: self.client.query_agents({"worker": str(worker_id % 5)})
+                    await self.measure_operation_async(
+                        results, "mixed-query",
+                        self._post(http, query_url, query)
                     )
                 else:
                     # Write operation
-                    result = self.measure_operation(
-                        "mixed-create",
-                        lambda: self.client.create_agent(
-                            "mixed-workload-agent",
-                            {
-                                "name": f"MixedAgent-{worker_id}-{operation_count}",
-                                "timestamp": time.time()
-                            },
-                            {"worker": str(worker_id), "test": "mixed-workload"}
-                        )
+                    body["name"] = f"MixedAgent-{worker_id}-{operation_count}"
+                    body["timestamp"] = time.time()
+                    await self.measure_operation_async(
+                        results, "mixed-create",
+                        self._post(http, objects_url, create)
                     )
-                
-                worker_results.append(result)
-                time.sleep(0.01)  # Small delay to avoid overwhelming
-            
-            return worker_results
         
-        # Start workers
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(worker, i) for i in range(num_workers)]
-            
-            # Let it run for specified duration
-            time.sleep(duration_seconds)
-            stop_flag.set()
-            
-            # Collect results
-            for future in concurrent.futures.as_completed(futures):
-                results.extend(future.result())
+        asyncio.run(self._run_workers(num_workers, worker))
         
-        successful_ops = [r for r in results if r["success"]]
-        reads = [r for r in successful_ops if r["operation"] == "mixed-query"]
-        writes = [r for r in successful_ops if r["operation"] == "mixed-create"]
+        reads = len(results.durations.get("mixed-query", ()))
+        writes = len(results.durations.get("mixed-create", ()))
         
-        print(f"  ✅ Completed {len(successful_ops)} operations ({len(reads)} reads, {len(writes)} writes)")
-        print(f"  📊 Overall throughput: {len(successful_ops)/duration_seconds:.2f} ops/sec")
+        print(f"  ✅ Completed {results.succeeded} operations ({reads} reads, {writes} writes)")
+        print(f"  📊 Overall throughput: {results.succeeded/duration_seconds:.2f} ops/sec")
         
         return results
     
-    def latency_benchmark(self, num_operations: int) -> List[Dict]:
+    def wrk_latency_benchmark(self, wrk: str, duration_seconds: int = 10) -> ResultSet:
+        """Benchmark single-connection create latency with wrk instead of Python"""
+        print(f"⏱️  Testing latency with wrk: 1 connection for {duration_seconds}s")
+        
+        results = ResultSet()
+        with tempfile.NamedTemporaryFile("w", suffix=".lua", delete=False) as script:
+            script.write(WRK_CREATE_SCRIPT)
+        try:
+            proc = subprocess.run(
+                [wrk, "-t", "1", "-c", "1", "-d", f"{duration_seconds}s", "--latency",
+                 "-s", script.name, self.client._objects_url],
+                capture_output=True, text=True, timeout=duration_seconds + 30
+            )
+        finally:
+            os.unlink(script.name)
+        
+        if proc.returncode != 0:
+            results.record("latency-create", 0, proc.stderr.strip() or f"wrk exited {proc.returncode}")
+            print(f"  ❌ wrk failed: {proc.stderr.strip()}")
+            return results
+        
+        stats = parse_wrk_output(proc.stdout)
+        for _ in range(stats["errors"]):
+            results.record("latency-create", 0, "wrk reported a failed request")
+        succeeded = max(0, stats["requests"] - stats["errors"])
+        if succeeded:
+            results.external["latency-create"] = {
+                "count": succeeded,
+                "avg_ms": stats["avg_ms"],
+                "percentiles": stats["percentiles"],
+            }
+        print(f"  ✅ Completed {succeeded} operations")
+        print(f"  📊 Throughput: {stats['requests_per_sec']:.2f} ops/sec")
+        print(f"  📊 Avg latency: {stats['avg_ms']:.3f}ms")
+        for label, value in stats["percentiles"].items():
+            print(f"  📊 {label.upper()} latency: {value:.3f}ms")
+        if stats["errors"]:
+            print(f"  ❌ Failed requests: {stats['errors']}")
+        print("  ℹ️  Query latency not measured with wrk (use --latency-tool python)")
+        
+        return results
+    
+    def latency_benchmark(self, num_operations: int) -> ResultSet:
         """Benchmark single-threaded latency"""
+        wrk = shutil.which("wrk") if self.latency_tool != "python" else None
+        if self.latency_tool == "wrk" and wrk is None:
+            raise RuntimeError("--latency-tool wrk requested but wrk is not on PATH")
+        if wrk:
+            return self.wrk_latency_benchmark(wrk)
+        
         print(f"⏱️  Testing latency: {num_operations} sequential operations")
         
-        results = []
+        results = ResultSet()
+        fast = self.fast_client
+        
+        tags = {"test": "latency"}
         
         # Create operations
         for i in range(num_operations):
-            result = self.measure_operation(
-                "latency-create",
-                lambda i=i: self.client.create_agent(
-                    "latency-test",
-                    {"name": f"LatencyAgent-{i}", "sequence": i},
-                    {"test": "latency"}
-                )
+            self.measure_operation(
+                results, "latency-create", fast.create_agent,
+                "latency-test", {"name": f"LatencyAgent-{i}", "sequence": i}, tags
             )
-            results.append(result)
         
         # Query operations
         for i in range(num_operations):
-            result = self.measure_operation(
-                "latency-query",
-                lambda: self.client.query_agents({"test": "latency"})
-            )
-            results.append(result)
+            self.measure_operation(results, "latency-query", fast.query_agents, tags)
         
-        successful_ops = [r for r in results if r["success"]]
-        durations = [r["duration"] for r in successful_ops]
+        durations = results.all_durations()
         
         if durations:
-            avg_latency = statistics.mean(durations) * 1000  # Convert to ms
-            p50_latency = statistics.median(durations) * 1000
-            p95_latency = statistics.quantiles(durations, n=20)[18] * 1000 if len(durations) > 20 else max(durations) * 1000
+            avg_latency = mean_ms(durations)
+            p50_latency, p95_latency = percentiles(durations, 0.50, 0.95)
             
-            print(f"  ✅ Completed {len(successful_ops)} operations")
+            print(f"  ✅ Completed {results.succeeded} operations")
             print(f"  📊 Avg latency: {avg_latency:.2f}ms")
             print(f"  📊 P50 latency: {p50_latency:.2f}ms")
             print(f"  📊 P95 latency: {p95_latency:.2f}ms")
@@ -251,7 +675,7 @@ class LoadTester:
             print("❌ AgentState server is not available")
             return False
         
-        all_results = []
+        all_results = ResultSet()
         
         try:
             # Test 1: Concurrent Creates
@@ -266,7 +690,7 @@ class LoadTester:
             
             # Test 3: Mixed Workload
             print("\n🔄 Test 3: Mixed Workload")
-            results3 = self.mixed_workload(duration_seconds=30, num_workers=15)
+            results3 = self.mixed_workload(duration_seconds=30, num_workers=15, rate=self.mixed_rate)
             all_results.extend(results3)
             
             # Test 4: Latency Benchmark
@@ -278,35 +702,45 @@ class LoadTester:
             print("\n📊 Overall Performance Summary")
             print("=" * 35)
             
-            successful_ops = [r for r in all_results if r["success"]]
-            failed_ops = [r for r in all_results if not r["success"]]
+            # One pass over the per-operation columns feeds the totals, the
+            # overall sample and the breakdown
+            merged = []
+            total_ns = 0
+            breakdown = []
+            for op_type, durations in all_results.durations.items():
+                op_ns = sum(durations)
+                total_ns += op_ns
+                merged.extend(durations)
+                breakdown.append((op_type, len(durations), op_ns / len(durations) / NS_PER_MS))
+            # wrk-timed operations only have aggregates: they count towards the
+            # totals and the average, but have no samples for the overall P95
+            external = all_results.external
+            for op_type, stats in external.items():
+                total_ns += stats["avg_ms"] * NS_PER_MS * stats["count"]
+                breakdown.append((op_type, stats["count"], stats["avg_ms"]))
+            succeeded = len(merged) + sum(stats["count"] for stats in external.values())
+            failed = all_results.failed
+            total = succeeded + failed
             
-            print(f"Total Operations: {len(all_results)}")
-            print(f"✅ Successful: {len(successful_ops)} ({len(successful_ops)/len(all_results)*100:.1f}%)")
-            print(f"❌ Failed: {len(failed_ops)} ({len(failed_ops)/len(all_results)*100:.1f}%)")
+            print(f"Total Operations: {total}")
+            print(f"✅ Successful: {succeeded} ({succeeded/total*100:.1f}%)")
+            print(f"❌ Failed: {failed} ({failed/total*100:.1f}%)")
             
-            if successful_ops:
-                durations = [r["duration"] for r in successful_ops]
-                avg_latency = statistics.mean(durations) * 1000
-                p95_latency = statistics.quantiles(durations, n=20)[18] * 1000 if len(durations) > 20 else max(durations) * 1000
-                
+            if succeeded:
+                avg_latency = total_ns / succeeded / NS_PER_MS
                 print(f"Average Latency: {avg_latency:.2f}ms")
-                print(f"P95 Latency: {p95_latency:.2f}ms")
+            if merged:
+                merged.sort()
+                p95_latency, = percentiles(merged, 0.95, presorted=True)
+                note = f" (excludes wrk-timed {', '.join(external)})" if external else ""
+                print(f"P95 Latency: {p95_latency:.2f}ms{note}")
             
             # Operation breakdown
-            ops_by_type = {}
-            for result in successful_ops:
-                op_type = result["operation"]
-                if op_type not in ops_by_type:
-                    ops_by_type[op_type] = []
-                ops_by_type[op_type].append(result["duration"])
-            
             print(f"\n📈 Performance by Operation Type:")
-            for op_type, durations in ops_by_type.items():
-                avg_ms = statistics.mean(durations) * 1000
-                print(f"  {op_type}: {len(durations)} ops, {avg_ms:.2f}ms avg")
+            for op_type, count, avg_ms in breakdown:
+                print(f"  {op_type}: {count} ops, {avg_ms:.2f}ms avg")
             
-            if len(failed_ops) == 0:
+            if failed == 0:
                 print(f"\n🎉 Load test completed successfully!")
                 print(f"✅ AgentState handles concurrent load well")
                 print(f"✅ Low latency performance")
@@ -314,18 +748,59 @@ class LoadTester:
                 return True
             else:
                 print(f"\n⚠️  Load test completed with some errors")
-                print(f"❌ {len(failed_ops)} operations failed")
+                print(f"❌ {failed} operations failed")
                 return False
                 
         except Exception as e:
             print(f"\n❌ Load test failed with error: {e}")
             return False
 
+def positive_rate(value: str) -> float:
+    """argparse type for --mixed-rate: ops/sec must be above zero"""
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"rate must be positive, got {value}")
+    return rate
+
+def parse_cpu_list(spec: str) -> set:
+    """Parse a taskset-style CPU list such as "4-7" or "0,2,4-5" """
+    cpus = set()
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+def pin_to_cpus(spec: str) -> None:
+    """Keep the load generator off the server's cores (Linux only)"""
+    if not hasattr(os, "sched_setaffinity"):
+        print("⚠️  CPU pinning is not supported on this platform; running unpinned")
+        return
+    cpus = parse_cpu_list(spec)
+    os.sched_setaffinity(0, cpus)
+    print(f"📌 Load generator pinned to CPUs {sorted(cpus)}")
+
 def main():
+    parser = argparse.ArgumentParser(description="AgentState load tests")
+    parser.add_argument("--backend", choices=["requests", "pipeline"], default="requests",
+                        help="transport for the concurrent query test (pipeline = HTTP/1.1 pipelining)")
+    parser.add_argument("--mixed-rate", type=positive_rate, default=None,
+                        help="cap the mixed workload at this many ops/sec (default: unthrottled)")
+    parser.add_argument("--cpus", default=os.environ.get("LOAD_TEST_CPUS"),
+                        help="pin the load generator to these CPUs, e.g. 4-7 (start the server "
+                             "on others, e.g. taskset -c 0-3)")
+    parser.add_argument("--latency-tool", choices=["auto", "python", "wrk"], default="auto",
+                        help="latency benchmark driver; auto uses wrk when it is on PATH")
+    args = parser.parse_args()
+    
+    if args.cpus:
+        pin_to_cpus(args.cpus)
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     print("⚡ AgentState Performance Testing")
     print("=" * 40)
     
-    tester = LoadTester()
+    tester = LoadTester(backend=args.backend, mixed_rate=args.mixed_rate, latency_tool=args.latency_tool)
     success = tester.run_comprehensive_load_test()
     
     return 0 if success else 1
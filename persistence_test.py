@@ -7,6 +7,8 @@ Tests data persistence, WAL functionality, and crash recovery.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
 import subprocess
@@ -18,17 +20,24 @@ class PersistenceTestClient:
     def __init__(self, base_url: str = "http://localhost:8080"):
         self.base_url = base_url.rstrip('/')
         self.session = requests.Session()
+        # Room for the parallel creates below to each keep a connection
+        adapter = HTTPAdapter(pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.docker_client = docker.from_env()
     
-    def health_check(self) -> bool:
+    def health_check(self, timeout: float = 5) -> bool:
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=timeout)
             return response.status_code == 200 and response.text.strip() == "ok"
         except:
             return False
     
-    def create_agent(self, agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None) -> Dict[str, Any]:
+    def create_agent(self, agent_type: str, body: Dict[str, Any], tags: Dict[str, str] = None,
+                     agent_id: str = None) -> Dict[str, Any]:
         payload = {"type": agent_type, "body": body, "tags": tags or {}}
+        if agent_id:
+            payload["id"] = agent_id
         response = self.session.post(f"{self.base_url}/v1/persistence-test/objects", json=payload)
         response.raise_for_status()
         return response.json()
@@ -54,14 +63,20 @@ class PersistenceTestClient:
             print("🚀 Starting AgentState container...")
             container.start()
             
-            # Wait for container to be ready
+            # Wait for container to be ready: probe fast at first, backing off
+            # to 1s, so a quick recovery is noticed within tens of ms
             print("⏳ Waiting for container to be ready...")
-            max_retries = 30
-            for i in range(max_retries):
-                if self.health_check():
-                    print(f"✅ Container ready after {i + 1} attempts")
+            delay = 0.05
+            attempts = 0
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                attempts += 1
+                # A slow answer during warmup means not ready yet
+                if self.health_check(timeout=1):
+                    print(f"✅ Container ready after {attempts} attempts")
                     return True
-                time.sleep(1)
+                time.sleep(delay)
+                delay = min(delay * 1.6, 1.0)
             
             print("❌ Container failed to start within timeout")
             return False
@@ -88,10 +103,9 @@ def test_persistence_after_restart():
     try:
         # Create test data
         print("📝 Creating test agents...")
-        test_agents = []
         
-        for i in range(5):
-            agent = client.create_agent(
+        def create(i: int) -> Dict[str, Any]:
+            return client.create_agent(
                 "persistent-agent",
                 {
                     "name": f"PersistentAgent{i}",
@@ -105,7 +119,11 @@ def test_persistence_after_restart():
                     "index": str(i)
                 }
             )
-            test_agents.append(agent)
+        
+        # Independent creates: run them in parallel over the pooled session
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            test_agents = list(executor.map(create, range(5)))
+        for i, agent in enumerate(test_agents):
             print(f"  ✅ Created agent {i}: {agent['id']}")
         
         # Verify data exists before restart
@@ -193,10 +211,9 @@ def test_wal_recovery():
     try:
         # Create agents to populate WAL
         print("📝 Creating agents to populate WAL...")
-        wal_agents = []
         
-        for i in range(10):
-            agent = client.create_agent(
+        def create(i: int) -> Dict[str, Any]:
+            return client.create_agent(
                 "wal-test-agent",
                 {
                     "name": f"WALAgent{i}",
@@ -208,9 +225,11 @@ def test_wal_recovery():
                     "sequence": str(i)
                 }
             )
-            wal_agents.append(agent)
-            # Small delay to ensure different timestamps
-            time.sleep(0.1)
+        
+        # The server orders writes by commit_seq, so no spacing between
+        # creates is needed; they can all go out at once
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            wal_agents = list(executor.map(create, range(10)))
         
         print(f"  ✅ Created {len(wal_agents)} agents for WAL test")
         
@@ -231,12 +250,21 @@ def test_wal_recovery():
             print(f"❌ WAL recovery failed: expected 10 agents, found {len(recovered_agents)}")
             return False
         
-        # Verify sequence integrity
-        sequences = sorted([agent["body"]["sequence"] for agent in recovered_agents])
-        expected_sequences = list(range(10))
+        # Verify sequence integrity: every agent comes back at the commit_seq
+        # and with the body it was written with (per id, so order is irrelevant)
+        created = {agent["id"]: agent for agent in wal_agents}
+        for agent in recovered_agents:
+            original = created.get(agent["id"])
+            if original is None or (agent["commit_seq"], agent["body"]["sequence"]) != \
+                    (original["commit_seq"], original["body"]["sequence"]):
+                print(f"❌ Sequence integrity check failed for {agent['id']}: "
+                      f"recovered commit_seq={agent['commit_seq']} sequence={agent['body']['sequence']}")
+                return False
         
-        if sequences != expected_sequences:
-            print(f"❌ Sequence integrity check failed: expected {expected_sequences}, got {sequences}")
+        # 10 recovered agents (checked above) covering 10 distinct sequences: no gaps, no duplicates
+        sequences = {agent["body"]["sequence"] for agent in recovered_agents}
+        if sequences != set(range(10)):
+            print(f"❌ Sequence integrity check failed: expected 0-9, got {sorted(sequences)}")
             return False
         
         print("  ✅ All agents recovered from WAL with correct sequence")
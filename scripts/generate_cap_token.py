@@ -20,10 +20,16 @@ Usage examples:
 
 Then export as:
   export AGENTSTATE_API_KEY=$(python scripts/generate_cap_token.py --kid active --secret dev-secret --ns langchain-demo --verb put --verb get --verb delete --verb query --verb lease)
+
+As a library (e.g. minting many tokens in CI), import make_token:
+
+  from generate_cap_token import make_token
+  token = make_token("active", b"dev-secret", ["ci-1"], ["put", "get"], ttl=600)
 """
 
 import argparse
 import base64
+import functools
 import hashlib
 import hmac
 import json
@@ -36,6 +42,40 @@ def b64url_nopad(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode().rstrip("=")
 
 
+@functools.lru_cache(maxsize=64)
+def _static_claims(namespaces: tuple, verbs: tuple) -> bytes:
+    """Serialized ns/verbs claims, left open so the per-token fields can be appended."""
+    return json.dumps({"ns": list(namespaces), "verbs": list(verbs)}, separators=(",", ":"))[:-1].encode()
+
+
+@functools.lru_cache(maxsize=16)
+def _keyed_hmac(secret: bytes):
+    """HMAC-SHA256 with the key already absorbed; copy() it per token."""
+    return hmac.new(secret, None, hashlib.sha256)
+
+
+def make_token(kid, secret, namespaces, verbs, ttl=3600, jti=None, region=None, now=None) -> str:
+    """Build a kid.payload.sig capability token.
+
+    Only iat/exp (and jti/region when given) are serialized per call; the
+    ns/verbs JSON and the keyed HMAC state are cached across calls.
+    """
+    if isinstance(secret, str):
+        secret = secret.encode()
+    if now is None:
+        now = int(time.time())
+    # Assembled as bytes throughout: no str payload to re-encode before signing
+    payload = b'%s,"iat":%d,"exp":%d' % (_static_claims(tuple(namespaces), tuple(verbs)), now, now + ttl)
+    if jti:
+        payload += b',"jti":' + json.dumps(jti).encode()
+    if region:
+        payload += b',"region":' + json.dumps(region).encode()
+    payload += b"}"
+    mac = _keyed_hmac(secret).copy()
+    mac.update(payload)
+    return f"{kid}.{b64url_nopad(payload)}.{b64url_nopad(mac.digest())}"
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--kid", default=os.environ.get("CAP_KEY_ACTIVE_ID", "active"), help="key id: usually 'active' or 'next'")
@@ -51,23 +91,15 @@ def main():
         print("error: missing --secret (or CAP_KEY_ACTIVE env)", file=sys.stderr)
         sys.exit(2)
 
-    now = int(time.time())
-    claims = {
-        "ns": args.namespaces or ["default"],
-        "verbs": args.verbs or ["put", "get", "delete", "query", "lease"],
-        "iat": now,
-        "exp": now + args.ttl,
-    }
-    if args.jti:
-        claims["jti"] = args.jti
-    if args.region:
-        claims["region"] = args.region
-
-    payload = json.dumps(claims, separators=(",", ":")).encode()
-    sig = hmac.new(args.secret.encode(), payload, hashlib.sha256).digest()
-
-    token = f"{args.kid}.{b64url_nopad(payload)}.{b64url_nopad(sig)}"
-    print(token)
+    print(make_token(
+        args.kid,
+        args.secret,
+        args.namespaces or ["default"],
+        args.verbs or ["put", "get", "delete", "query", "lease"],
+        ttl=args.ttl,
+        jti=args.jti,
+        region=args.region,
+    ))
 
 
 if __name__ == "__main__":
@@ -1,4 +1,9 @@
-from .client import AgentStateClient
+from .client import AgentNotFound, AgentStateClient, PreparedQuery
+
+try:  # optional: requires the "async" extra (httpx)
+    from .async_client import AsyncAgentStateClient
+except ImportError:
+    AsyncAgentStateClient = None
 
 # For backward compatibility
 State = AgentStateClient
@@ -7,5 +12,5 @@ __version__ = "1.0.1"
 __author__ = "Ayush Mittal"
 __email__ = "ayushsmittal@gmail.com"
 
-__all__ = ["AgentStateClient", "State"]
+__all__ = ["AgentNotFound", "AgentStateClient", "AsyncAgentStateClient", "PreparedQuery", "State"]
 
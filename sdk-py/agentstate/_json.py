@@ -0,0 +1,29 @@
+"""JSON encode/decode helpers shared by the sync and async clients."""
+import json
+from typing import Any
+
+
+def _default(obj: Any) -> Any:
+    # numpy arrays and scalars (e.g. embeddings in agent bodies) become plain lists/numbers
+    tolist = getattr(obj, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+
+    # Same inputs as the stdlib path: numpy values natively, and int/float/bool
+    # dict keys converted to strings instead of raising
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional (pip install agentstate[fast])
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+
+    _loads = json.loads
@@ -0,0 +1,134 @@
+import httpx
+from typing import Any, Dict, Optional, List
+import os
+from ._json import _dumps, _loads
+from .client import AgentNotFound
+
+
+class AsyncAgentNotFound(AgentNotFound, httpx.HTTPStatusError):
+    """AgentNotFound raised by the async client.
+
+    Also an httpx.HTTPStatusError, like every other error status the async
+    client raises, so existing httpx handlers still catch a 404.
+    """
+
+    def __init__(self, message: str, *, response: httpx.Response):
+        httpx.HTTPStatusError.__init__(self, message, request=response.request, response=response)
+
+
+def _raise_for_agent(response: httpx.Response, agent_id: str) -> None:
+    if response.status_code == 404:
+        raise AsyncAgentNotFound(f"404 Not Found: agent {agent_id!r} does not exist", response=response)
+    response.raise_for_status()
+
+
+class AsyncAgentStateClient:
+    """
+    Asyncio variant of AgentStateClient backed by httpx.AsyncClient.
+
+    Requests share one pooled (HTTP/2 capable) connection set, so independent
+    calls can be issued concurrently with asyncio.gather.
+
+    Example:
+        async with AsyncAgentStateClient("http://localhost:8080", "my-app") as client:
+            agents = await asyncio.gather(*[
+                client.create_agent("worker", {"index": i}) for i in range(10)
+            ])
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "default",
+                 api_key: Optional[str] = None, max_connections: int = 64,
+                 max_keepalive_connections: int = 32, http2: bool = True,
+                 h2c: bool = False):
+        """
+        Initialize async AgentState client.
+
+        Args:
+            base_url: AgentState server URL (e.g., "http://localhost:8080")
+            namespace: Namespace for organizing agents (e.g., "production", "staging")
+            api_key: API key for authentication (optional, can also be set via AGENTSTATE_API_KEY env var)
+            max_connections: Upper bound on open connections in the pool
+            max_keepalive_connections: Idle connections kept alive for reuse
+            http2: Multiplex requests over HTTP/2 when the server supports it
+                   (negotiated via TLS ALPN, so https:// only)
+            h2c: Speak HTTP/2 with prior knowledge over plain http://, so all
+                 requests share one multiplexed connection without TLS
+        """
+        self.base_url = base_url.rstrip('/')
+        self.namespace = namespace
+        ns_url = f"{self.base_url}/v1/{self.namespace}"
+        self._objects_url = ns_url + "/objects"
+        self._query_url = ns_url + "/query"
+        self._health_url = self.base_url + "/health"
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'agentstate-python-sdk/1.0.1'
+        }
+        api_key = api_key or os.environ.get('AGENTSTATE_API_KEY')
+        if api_key:
+            headers['Authorization'] = f'Bearer {api_key}'
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            http1=not h2c,
+            http2=http2 or h2c,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections)
+        )
+
+    async def __aenter__(self) -> "AsyncAgentStateClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
+
+    async def create_agent(self, agent_type: str, body: Dict[str, Any],
+                           tags: Optional[Dict[str, str]] = None,
+                           agent_id: Optional[str] = None) -> Dict[str, Any]:
+        """Create or update an agent. See AgentStateClient.create_agent."""
+        payload = {
+            "type": agent_type,
+            "body": body,
+            "tags": tags or {}
+        }
+        if agent_id:
+            payload["id"] = agent_id
+
+        response = await self.client.post(self._objects_url, content=_dumps(payload))
+        response.raise_for_status()
+        return _loads(response.content)
+
+    async def get_agent(self, agent_id: str) -> Dict[str, Any]:
+        """Get agent by ID. See AgentStateClient.get_agent."""
+        response = await self.client.get(f"{self._objects_url}/{agent_id}")
+        _raise_for_agent(response, agent_id)
+        return _loads(response.content)
+
+    async def query_agents(self, tags: Optional[Dict[str, str]] = None,
+                           agent_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Query agents by tags and type. See AgentStateClient.query_agents."""
+        query = {}
+        if tags:
+            query["tags"] = tags
+        if agent_type:
+            query["type"] = agent_type
+
+        response = await self.client.post(self._query_url, content=_dumps(query))
+        response.raise_for_status()
+        return _loads(response.content)
+
+    async def delete_agent(self, agent_id: str) -> None:
+        """Delete an agent. See AgentStateClient.delete_agent."""
+        response = await self.client.delete(f"{self._objects_url}/{agent_id}")
+        _raise_for_agent(response, agent_id)
+
+    async def health_check(self) -> bool:
+        """Check if AgentState server is healthy."""
+        try:
+            response = await self.client.get(self._health_url, timeout=5)
+            return response.status_code == 200 and response.text.strip() == "ok"
+        except httpx.HTTPError:
+            return False
@@ -1,6 +1,63 @@
 import requests
-from typing import Any, Dict, Optional, List, Union
-import time, json, os, random
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, List, Tuple, Union
+import time, os, random
+from ._json import _dumps, _loads
+
+# Request body for an unfiltered query; sent as-is instead of encoding {} per call
+_EMPTY_QUERY = b"{}"
+
+try:
+    import ijson
+except ImportError:  # optional (pip install agentstate[stream])
+    ijson = None
+
+
+class AgentNotFound(requests.HTTPError):
+    """The server has no agent with the requested ID (HTTP 404).
+
+    A subclass of requests.HTTPError, so existing handlers still catch it; it
+    lets callers tell a missing agent apart from timeouts and other failures.
+    """
+
+
+def _raise_for_agent(response: requests.Response, agent_id: str) -> None:
+    if response.status_code == 404:
+        raise AgentNotFound(f"404 Not Found: agent {agent_id!r} does not exist", response=response)
+    response.raise_for_status()
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests that don't pass one."""
+
+    def __init__(self, *args, timeout: Optional[Union[float, Tuple[float, float]]] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+
+class PreparedQuery:
+    """
+    A tag query whose request body is encoded once and reused.
+    
+    Create with AgentStateClient.prepare_query() and call execute() for each
+    run; useful for filters issued on every agent turn.
+    """
+    __slots__ = ("_client", "_body")
+
+    def __init__(self, client: "AgentStateClient", tags: Optional[Dict[str, str]] = None):
+        self._client = client
+        self._body = _dumps({"tags": tags}) if tags else _EMPTY_QUERY
+
+    def execute(self) -> List[Dict[str, Any]]:
+        """Run the query and return matching agent objects."""
+        response = self._client.session.post(self._client._query_url, data=self._body)
+        response.raise_for_status()
+        return _loads(response.content)
 
 
 class AgentStateClient:
@@ -25,7 +82,10 @@ class AgentStateClient:
         agents = client.query_agents({"team": "support"})
     """
     
-    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "default", api_key: Optional[str] = None):
+    def __init__(self, base_url: str = "http://localhost:8080", namespace: str = "default", api_key: Optional[str] = None,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 pool_connections: int = 32, pool_maxsize: int = 64, pool_block: bool = False,
+                 query_cache_ttl: float = 0.0, session: Optional[requests.Session] = None):
         """
         Initialize AgentState client.
         
@@ -33,12 +93,62 @@ class AgentStateClient:
             base_url: AgentState server URL (e.g., "http://localhost:8080")
             namespace: Namespace for organizing agents (e.g., "production", "staging")
             api_key: API key for authentication (optional, can also be set via AGENTSTATE_API_KEY env var)
+            timeout: Default request timeout in seconds, or a (connect, read) tuple
+            pool_connections: Number of host pools to cache
+            pool_maxsize: Maximum pooled keep-alive connections per host; size it
+                          to the number of threads sharing this client
+            pool_block: Wait for a free pooled connection instead of opening an
+                        extra, unpooled one when all pool_maxsize are busy
+            query_cache_ttl: Seconds to reuse query_agents() results (0 disables).
+                             Writes through this client invalidate the cache; once
+                             expired, an entry is revalidated against the namespace's
+                             commit watermark instead of re-running the query.
+            session: Existing session to share with other clients (e.g. one per
+                     namespace); its connection pool is reused as-is
         """
         self.base_url = base_url.rstrip('/')
         self.namespace = namespace
-        self.session = requests.Session()
+        # Endpoint URLs are fixed per client; build them once instead of per call
+        ns_url = f"{self.base_url}/v1/{self.namespace}"
+        self._objects_url = ns_url + "/objects"
+        self._query_url = ns_url + "/query"
+        self._query_multi_url = ns_url + "/query/multi"
+        self._commit_url = ns_url + "/commit"
+        self._batch_url = ns_url + "/batch"
+        self._watch_url = ns_url + "/watch"
+        self._lease_acquire_url = ns_url + "/lease/acquire"
+        self._lease_renew_url = ns_url + "/lease/renew"
+        self._lease_release_url = ns_url + "/lease/release"
+        self._health_url = self.base_url + "/health"
+        self.query_cache_ttl = query_cache_ttl
+        # key -> (fetched_at, result, server commit watermark or None)
+        self._query_cache: Dict[Any, Tuple[float, List[Dict[str, Any]], Optional[int]]] = {}
+        self._write_version = 0
+        self._owns_session = session is None
+        self.session = session or requests.Session()
+        adapter = self.session.get_adapter(self.base_url)
+        if isinstance(adapter, _TimeoutHTTPAdapter):
+            # Shared session already set up by another client
+            self._adapter = adapter
+            if timeout is not None:
+                self._adapter.timeout = timeout
+        else:
+            # Keep-alive pool sized for concurrent callers; idempotent requests are
+            # retried on transient gateway errors.
+            self._adapter = _TimeoutHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                max_retries=Retry(total=3, backoff_factor=0.1,
+                                  status_forcelist=[502, 503, 504], raise_on_status=False),
+                timeout=timeout
+            )
+            self.session.mount('http://', self._adapter)
+            self.session.mount('https://', self._adapter)
         self.session.headers.update({
             'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Connection': 'keep-alive',
             'User-Agent': 'agentstate-python-sdk/1.0.1'
         })
         
@@ -47,9 +157,35 @@ class AgentStateClient:
         if api_key:
             self.session.headers['Authorization'] = f'Bearer {api_key}'
 
+    def __enter__(self) -> "AgentStateClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close pooled connections (a session passed in by the caller is left open)."""
+        if self._owns_session:
+            self.session.close()
+
+    @property
+    def timeout(self) -> Optional[Union[float, Tuple[float, float]]]:
+        """Default timeout applied to requests made through the session."""
+        return self._adapter.timeout
+
+    @timeout.setter
+    def timeout(self, value: Optional[Union[float, Tuple[float, float]]]) -> None:
+        self._adapter.timeout = value
+
+    def _invalidate_queries(self) -> None:
+        """Bump the write version so cached query results are not reused."""
+        self._write_version += 1
+
     def create_agent(self, agent_type: str, body: Dict[str, Any], 
                     tags: Optional[Dict[str, str]] = None, 
-                    agent_id: Optional[str] = None) -> Dict[str, Any]:
+                    agent_id: Optional[str] = None,
+                    expected_seq: Optional[int] = None,
+                    idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Create or update an agent.
         
@@ -58,6 +194,10 @@ class AgentStateClient:
             body: Agent state data (any JSON-serializable object)
             tags: Key-value pairs for querying and organization
             agent_id: Specific ID to use (for updates), auto-generated if None
+            expected_seq: For updates, fail with 409 unless the agent is still
+                          at this commit_seq (sent as If-Match)
+            idempotency_key: Retries with the same key and body return the first
+                             result instead of writing again
             
         Returns:
             Created agent object with id, type, body, tags, commit_seq, commit_ts
@@ -69,10 +209,49 @@ class AgentStateClient:
         }
         if agent_id:
             payload["id"] = agent_id
+        # Session defaults cover the common case; only conditional writes need a dict
+        headers = None
+        if expected_seq is not None or idempotency_key:
+            headers = {}
+            if expected_seq is not None:
+                headers["If-Match"] = str(expected_seq)
+            if idempotency_key:
+                headers["Idempotency-Key"] = idempotency_key
             
-        response = self.session.post(f"{self.base_url}/v1/{self.namespace}/objects", json=payload)
+        self._invalidate_queries()
+        response = self.session.post(self._objects_url, data=_dumps(payload), headers=headers)
+        response.raise_for_status()
+        return _loads(response.content)
+
+    def get_or_create_agent(self, agent_id: str, agent_type: str, body: Dict[str, Any],
+                            tags: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Return the agent with this ID, creating it from body/tags if absent.
+        
+        One round trip: the server only writes when the agent does not exist
+        (sent with If-None-Match: *).
+        
+        Args:
+            agent_id: Unique agent identifier
+            agent_type: Type used if the agent is created
+            body: Initial state used if the agent is created
+            tags: Initial tags used if the agent is created
+            
+        Returns:
+            Existing or newly created agent object
+        """
+        payload = {
+            "type": agent_type,
+            "body": body,
+            "tags": tags or {},
+            "id": agent_id
+        }
+        
+        self._invalidate_queries()
+        response = self.session.post(self._objects_url, data=_dumps(payload),
+                                     headers={"If-None-Match": "*"})
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
 
     def get_agent(self, agent_id: str) -> Dict[str, Any]:
         """
@@ -83,38 +262,313 @@ class AgentStateClient:
             
         Returns:
             Agent object with id, type, body, tags, commit_seq, commit_ts
+            
+        Raises:
+            AgentNotFound: No agent with this ID exists
         """
-        response = self.session.get(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
-        response.raise_for_status()
-        return response.json()
+        response = self.session.get(f"{self._objects_url}/{agent_id}")
+        _raise_for_agent(response, agent_id)
+        return _loads(response.content)
 
-    def query_agents(self, tags: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    def query_agents(self, tags: Optional[Dict[str, str]] = None, fresh: bool = False,
+                     agent_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Query agents by tags.
         
         Args:
             tags: Tag filters (e.g., {"team": "support", "status": "active"})
+            fresh: Bypass the query cache (only relevant with query_cache_ttl)
+            agent_type: Only return agents of this type (filtered server-side)
             
         Returns:
             List of matching agent objects
         """
+        if self.query_cache_ttl > 0:
+            key = (frozenset(tags.items()) if tags else frozenset(), self._write_version, agent_type)
+            now = time.monotonic()
+            hit = self._query_cache.get(key)
+            if hit and not fresh:
+                if now - hit[0] < self.query_cache_ttl:
+                    return hit[1]
+                if hit[2] is not None and self.head_commit() == hit[2]:
+                    # Nothing was written to the namespace since the result was taken
+                    self._query_cache[key] = (now, hit[1], hit[2])
+                    return hit[1]
+        
+        if agent_type:
+            body = _dumps({"tags": tags, "type": agent_type} if tags else {"type": agent_type})
+        else:
+            body = _dumps({"tags": tags}) if tags else _EMPTY_QUERY
+            
+        response = self.session.post(self._query_url, data=body)
+        response.raise_for_status()
+        result = _loads(response.content)
+        if self.query_cache_ttl > 0:
+            watermark = response.headers.get("X-Commit-Seq")
+            # TTL'd objects can expire without a commit, so those results only use the TTL
+            if watermark is not None and not any(o.get("ttl_seconds") for o in result):
+                watermark = int(watermark)
+            else:
+                watermark = None
+            self._query_cache = {k: v for k, v in self._query_cache.items() if k[1] == key[1]}
+            self._query_cache[key] = (now, result, watermark)
+        return result
+
+    def head_commit(self) -> int:
+        """
+        Latest commit sequence in the namespace (0 if nothing was written).
+        
+        Any write to the namespace advances it, so an unchanged value means
+        earlier query results are still current.
+        """
+        response = self.session.get(self._commit_url)
+        response.raise_for_status()
+        return _loads(response.content)["commit_seq"]
+
+    def prepare_query(self, tags: Optional[Dict[str, str]] = None) -> PreparedQuery:
+        """
+        Encode a tag query once for repeated execution.
+        
+        Args:
+            tags: Tag filters (e.g., {"team": "support", "status": "active"})
+            
+        Returns:
+            PreparedQuery whose execute() returns the same result as query_agents(tags)
+        """
+        return PreparedQuery(self, tags)
+    
+    def iter_query_agents(self, tags: Optional[Dict[str, str]] = None,
+                          agent_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Query agents by tags, yielding each agent as it is parsed.
+        
+        With ijson installed the response is parsed incrementally, so memory
+        stays proportional to one agent rather than the whole result list.
+        Without it this falls back to decoding the full response.
+        
+        Args:
+            tags: Tag filters (e.g., {"team": "support", "status": "active"})
+            agent_type: Only return agents of this type (filtered server-side)
+            
+        Yields:
+            Matching agent objects
+        """
         query = {}
         if tags:
             query["tags"] = tags
+        if agent_type:
+            query["type"] = agent_type
             
-        response = self.session.post(f"{self.base_url}/v1/{self.namespace}/query", json=query)
-        response.raise_for_status()
-        return response.json()
+        with self.session.post(self._query_url, data=_dumps(query), stream=True) as response:
+            response.raise_for_status()
+            if ijson is None:
+                yield from _loads(response.content)
+                return
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, 'item')
     
+    def query_agents_multi(self, queries: Dict[str, Optional[Dict[str, str]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run several named tag queries in a single request.
+
+        Args:
+            queries: Mapping of result name to tag filter
+                     (e.g., {"agents": {"type": "chat-agent"}, "coord": {"type": "coordination"}})
+
+        Returns:
+            Mapping of result name to matching agent objects. Falls back to
+            concurrent query_agents() calls if the server has no multi-query endpoint.
+        """
+        payload = {"queries": {name: ({"tags": tags} if tags else {}) for name, tags in queries.items()}}
+        response = self.session.post(self._query_multi_url, data=_dumps(payload))
+        if response.status_code in (404, 405):
+            # Server predates the multi-query endpoint
+            with ThreadPoolExecutor(max_workers=max(1, len(queries))) as executor:
+                results = executor.map(self.query_agents, queries.values())
+                return dict(zip(queries.keys(), results))
+        response.raise_for_status()
+        return _loads(response.content)
+
     def delete_agent(self, agent_id: str) -> None:
         """
         Delete an agent.
         
         Args:
             agent_id: Unique agent identifier
+            
+        Raises:
+            AgentNotFound: No agent with this ID exists
+        """
+        self._invalidate_queries()
+        response = self.session.delete(f"{self._objects_url}/{agent_id}")
+        _raise_for_agent(response, agent_id)
+    
+    def append_messages(self, agent_id: str, messages: List[Dict[str, Any]],
+                        path: str = "memory.messages",
+                        fields: Optional[Dict[str, Any]] = None,
+                        expected_seq: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Append items to an array in an agent's body without resending the body.
+        
+        Args:
+            agent_id: Unique agent identifier
+            messages: Items to append
+            path: Dot-separated path to the array (created if missing)
+            fields: Top-level body fields to set in the same write (e.g. last_message_at)
+            expected_seq: Fail with 409 unless the agent is still at this commit_seq
+            
+        Returns:
+            Updated agent object
+        """
+        payload = {"path": path, "items": messages}
+        if fields:
+            payload["set"] = fields
+        if expected_seq is not None:
+            payload["expected_seq"] = expected_seq
+            
+        self._invalidate_queries()
+        response = self.session.post(f"{self._objects_url}/{agent_id}/append", data=_dumps(payload))
+        response.raise_for_status()
+        return _loads(response.content)
+
+    def patch_agent(self, agent_id: str, ops: List[Dict[str, Any]],
+                    expected_seq: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Apply field-level updates to an agent's body without resending it.
+        
+        Args:
+            agent_id: Unique agent identifier
+            ops: Operations applied in order, each {"op", "path", "value"} where
+                 op is "set", "remove", "append" (one value) or "extend"
+                 (list of values) and path is a JSON pointer into the body,
+                 e.g. {"op": "set", "path": "/memory/messages", "value": []}
+            expected_seq: Fail with 409 unless the agent is still at this commit_seq
+            
+        Returns:
+            Updated agent object
         """
-        response = self.session.delete(f"{self.base_url}/v1/{self.namespace}/objects/{agent_id}")
+        payload = {"ops": ops}
+        if expected_seq is not None:
+            payload["expected_seq"] = expected_seq
+            
+        self._invalidate_queries()
+        response = self.session.patch(f"{self._objects_url}/{agent_id}", data=_dumps(payload))
         response.raise_for_status()
+        return _loads(response.content)
+
+    def create_agents_bulk(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create or update several agents in a single request.
+        
+        Args:
+            specs: List of dicts with the create_agent() arguments
+                   (agent_type, body, and optionally tags and agent_id)
+            
+        Returns:
+            Created agent objects, in the same order as specs. Falls back to
+            create_agents() if the server has no batch endpoint.
+        """
+        puts = []
+        for spec in specs:
+            put = {
+                "type": spec["agent_type"],
+                "body": spec["body"],
+                "tags": spec.get("tags") or {}
+            }
+            if spec.get("agent_id"):
+                put["id"] = spec["agent_id"]
+            puts.append(put)
+        
+        self._invalidate_queries()
+        response = self.session.post(self._batch_url, data=_dumps({"puts": puts}))
+        if response.status_code in (404, 405):
+            # Server predates the batch endpoint
+            return self.create_agents(specs)
+        response.raise_for_status()
+        return _loads(response.content)["objects"]
+
+    def create_agents(self, specs: List[Dict[str, Any]], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        Create or update several agents with concurrent create_agent() calls.
+        
+        Needs no server support; requests run in parallel over the session's
+        connection pool. Prefer create_agents_bulk() against servers that
+        expose the batch endpoint.
+        
+        Args:
+            specs: List of dicts with the create_agent() arguments
+            max_workers: Maximum concurrent requests
+            
+        Returns:
+            Created agent objects, in the same order as specs
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda spec: self.create_agent(**spec), specs))
+
+    def delete_agents_bulk(self, agent_ids: List[str]) -> List[str]:
+        """
+        Delete several agents in a single request.
+        
+        Args:
+            agent_ids: Agent identifiers to delete
+            
+        Returns:
+            IDs that were deleted (IDs that did not exist are skipped). Falls
+            back to delete_agents() if the server has no batch endpoint.
+        """
+        self._invalidate_queries()
+        response = self.session.post(self._batch_url, data=_dumps({"deletes": list(agent_ids)}))
+        if response.status_code in (404, 405):
+            # Server predates the batch endpoint
+            return self.delete_agents(agent_ids)
+        response.raise_for_status()
+        return _loads(response.content)["deleted"]
+
+    def delete_agents(self, agent_ids: List[str], max_workers: int = 8) -> List[str]:
+        """
+        Delete several agents with concurrent delete_agent() calls.
+        
+        Needs no server support; prefer delete_agents_bulk() against servers
+        that expose the batch endpoint.
+        
+        Args:
+            agent_ids: Agent identifiers to delete
+            max_workers: Maximum concurrent requests
+            
+        Returns:
+            IDs that were deleted (IDs that did not exist are skipped)
+        """
+        def delete(agent_id: str) -> bool:
+            try:
+                self.delete_agent(agent_id)
+            except AgentNotFound:
+                return False
+            return True
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [agent_id for agent_id, deleted in zip(agent_ids, executor.map(delete, agent_ids)) if deleted]
+
+    def delete_agents_by_tag(self, tags: Dict[str, str]) -> List[str]:
+        """
+        Delete every agent matching the given tags in a single request.
+        
+        The match and the deletes both happen server-side in one batch.
+        
+        Args:
+            tags: Tag filters (e.g., {"test_run": "abc123"}); must not be empty
+            
+        Returns:
+            IDs that were deleted
+            
+        Raises:
+            ValueError: tags is empty (it would match every agent in the namespace)
+        """
+        if not tags:
+            raise ValueError("delete_agents_by_tag requires at least one tag")
+        self._invalidate_queries()
+        response = self.session.post(self._batch_url, data=_dumps({"delete_where": tags}))
+        response.raise_for_status()
+        return _loads(response.content)["deleted"]
     
     def health_check(self) -> bool:
         """
@@ -124,10 +578,9 @@ class AgentStateClient:
             True if server is healthy, False otherwise
         """
         try:
-            # Create a separate session without auth headers for health check
-            # The health endpoint should not require authentication
-            import requests
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            # Reuse the pooled connection, but drop the auth header: the health
+            # endpoint does not require authentication
+            response = self.session.get(self._health_url, headers={'Authorization': None}, timeout=5)
             return response.status_code == 200 and response.text.strip() == "ok"
         except:
             return False
@@ -137,7 +590,7 @@ class AgentStateClient:
             ttl_seconds: Optional[int] = None, id: Optional[str] = None, 
             idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Legacy method for backward compatibility. Use create_agent() instead."""
-        return self.create_agent(typ, body, tags, id)
+        return self.create_agent(typ, body, tags, id, idempotency_key=idempotency_key)
 
     def get(self, id: str) -> Dict[str, Any]:
         """Legacy method for backward compatibility. Use get_agent() instead."""
@@ -153,9 +606,15 @@ class AgentStateClient:
               on_gap: Optional[Any] = None,
               checkpoint_path: Optional[str] = None,
               backoff_min_ms: int = 250,
-              backoff_max_ms: int = 4000):
+              backoff_max_ms: int = 4000,
+              checkpoint_every: int = 100,
+              checkpoint_interval: float = 0.5):
         """SSE-based watch with auto-resume and jittered backoff.
         Prefer gRPC by using the provided Python client (not bundled) if desired.
+
+        The checkpoint is written (and fsync'd) every checkpoint_every events or
+        checkpoint_interval seconds, whichever comes first, plus once when the
+        generator is closed; after a crash up to that many events may be re-read.
         """
         last = from_commit or 0
         if checkpoint_path and os.path.exists(checkpoint_path):
@@ -165,43 +624,49 @@ class AgentStateClient:
             except Exception:
                 pass
 
+        persisted = last
+        persisted_at = time.monotonic()
+        pending = 0
+
         def save_checkpoint(n: int):
+            nonlocal persisted, persisted_at, pending
+            persisted, persisted_at, pending = n, time.monotonic(), 0
             if not checkpoint_path:
                 return
+            tmp = checkpoint_path + ".tmp"
             try:
-                with open(checkpoint_path, 'w') as f:
+                # Write aside and rename so a crash never leaves a torn checkpoint
+                with open(tmp, 'w') as f:
                     f.write(str(n))
                     f.flush()
                     os.fsync(f.fileno())
+                os.replace(tmp, checkpoint_path)
             except Exception:
                 pass
 
+        url = self._watch_url
         backoff = backoff_min_ms
-        while True:
-            try:
-                # SSE stream
-                url = f"{self.base_url}/v1/{self.namespace}/watch"
-                headers = {}
-                # from_commit is passed by SSE id resume via Last-Event-ID if supported; simplest: filter server-side by ignoring, but we embed in URL only via gRPC normally
-                # We will just resume client-side by filtering events < last
-                with requests.get(url, stream=True, headers=headers, timeout=60) as r:
-                    r.raise_for_status()
-                    buf = ""
-                    for line in r.iter_lines(decode_unicode=True):
-                        if line is None:
-                            continue
-                        if line.startswith(":"):
-                            continue
-                        if line.startswith("id:"):
-                            try:
-                                last = max(last, int(line.split(":",1)[1].strip()))
-                                save_checkpoint(last)
-                            except Exception:
-                                pass
-                        elif line.startswith("data:"):
-                            data = line.split(":",1)[1].strip()
+        try:
+            while True:
+                try:
+                    # SSE stream over the pooled session: reconnects after overflow
+                    # or backoff reuse the kept-alive socket when the server kept it
+                    headers = {'Accept': 'text/event-stream', 'Connection': 'keep-alive'}
+                    if last:
+                        # Server resumes after this commit, so nothing already seen is re-sent
+                        headers['Last-Event-ID'] = str(last)
+                    with self.session.get(url, stream=True, headers=headers, timeout=(5, 60)) as r:
+                        r.raise_for_status()
+                        # Raw byte lines: only data payloads are decoded, as JSON.
+                        # 8 KiB reads instead of the 512-byte default cut recv calls
+                        # on busy streams.
+                        for line in r.iter_lines(chunk_size=8192):
+                            # One prefix test per line: blank separators, ':' comments
+                            # and id: lines (commit is in the payload) all fall through
+                            if not line.startswith(b"data:"):
+                                continue
                             try:
-                                evt = json.loads(data)
+                                evt = _loads(line[5:])
                             except Exception:
                                 continue
                             if evt.get("error") == "overflow":
@@ -210,31 +675,38 @@ class AgentStateClient:
                                     except Exception: pass
                                 break  # reconnect
                             commit = evt.get("commit_seq") or evt.get("commit") or last
+                            # Defensive: drop anything already seen (e.g. servers that ignore Last-Event-ID)
                             if commit and int(commit) <= last:
                                 continue
                             last = int(commit)
-                            save_checkpoint(last)
+                            pending += 1
+                            if pending >= checkpoint_every or time.monotonic() - persisted_at >= checkpoint_interval:
+                                save_checkpoint(last)
                             yield evt
-                # overflow or end, backoff and resume
-                jitter = random.randint(0, max(1, backoff//4))
-                time.sleep((backoff + jitter) / 1000.0)
-                backoff = min(backoff_max_ms, max(backoff_min_ms, backoff * 2))
-            except requests.RequestException:
-                jitter = random.randint(0, max(1, backoff//4))
-                time.sleep((backoff + jitter) / 1000.0)
-                backoff = min(backoff_max_ms, max(backoff_min_ms, backoff * 2))
+                    # overflow or end, backoff and resume
+                    jitter = random.randint(0, max(1, backoff//4))
+                    time.sleep((backoff + jitter) / 1000.0)
+                    backoff = min(backoff_max_ms, max(backoff_min_ms, backoff * 2))
+                except requests.RequestException:
+                    jitter = random.randint(0, max(1, backoff//4))
+                    time.sleep((backoff + jitter) / 1000.0)
+                    backoff = min(backoff_max_ms, max(backoff_min_ms, backoff * 2))
+        finally:
+            # Consumer stopped (break/close/GC): persist the last delivered commit
+            if last != persisted:
+                save_checkpoint(last)
 
     def lease_acquire(self, key: str, owner: str, ttl: int):
-        r = requests.post(f"{self.base_url}/v1/{self.namespace}/lease/acquire", json={"key": key, "owner": owner, "ttl": ttl})
+        r = self.session.post(self._lease_acquire_url, data=_dumps({"key": key, "owner": owner, "ttl": ttl}))
         r.raise_for_status()
-        return r.json()
+        return _loads(r.content)
 
     def lease_renew(self, key: str, owner: str, token: int, ttl: int):
-        r = requests.post(f"{self.base_url}/v1/{self.namespace}/lease/renew", json={"key": key, "owner": owner, "token": token, "ttl": ttl})
+        r = self.session.post(self._lease_renew_url, data=_dumps({"key": key, "owner": owner, "token": token, "ttl": ttl}))
         r.raise_for_status()
-        return r.json()
+        return _loads(r.content)
 
     def lease_release(self, key: str, owner: str, token: int):
-        r = requests.post(f"{self.base_url}/v1/{self.namespace}/lease/release", json={"key": key, "owner": owner, "token": token})
+        r = self.session.post(self._lease_release_url, data=_dumps({"key": key, "owner": owner, "token": token}))
         r.raise_for_status()
         return True
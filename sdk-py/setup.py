@@ -43,6 +43,15 @@ setup(
             "isort>=5.10.0",
             "mypy>=1.0.0",
         ],
+        "async": [
+            "httpx[http2]>=0.24.0",
+        ],
+        "fast": [
+            "orjson>=3.8.0",
+        ],
+        "stream": [
+            "ijson>=3.2.0",
+        ],
         "grpc": [
             "grpcio>=1.50.0",
             "protobuf>=4.0.0",